@@ -1,18 +1,127 @@
-import json
-
-def handler(request):
-    """
-    Vercel Python Serverless Function
-    Endpoint: /api/compare
-    """
-    result = {
+"""
+UTL scoring service (FastAPI / ASGI).
+Endpoint: /api/compare (health), POST /score and /score/batch, GET /metrics
+
+Run locally:
+    uvicorn api.compare:app --port 8000
+
+Detectors stay warm in an in-process LRU/TTL pool keyed by conversation id;
+the lexicon matcher is compiled once at import, not per request.
+Set UTL_TIMING=1 to record per-stage latency histograms, served from
+/metrics in the Prometheus text format. UTL_FEATURE_CACHE=<entries> enables
+memoized text features; its hit/miss/eviction counters are on /metrics too.
+"""
+import os
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+
+from utl.channels import ChannelAggregator
+from utl.features import feature_cache
+from utl.lexicon import REGISTRY
+from utl.pool import DetectorPool
+from utl.timing import TIMER
+
+app = FastAPI(title="UTL scoring service")
+router = APIRouter()
+
+POOL = DetectorPool(
+    max_sessions=int(os.environ.get("UTL_POOL_MAX_SESSIONS", "100000")),
+    ttl=float(os.environ.get("UTL_POOL_TTL_SECONDS", "1800")),
+)
+AGGREGATOR = ChannelAggregator()
+REGISTRY.current()  # compile the lexicon at startup rather than on the first request
+if os.environ.get("UTL_LEXICON_WATCH_SECONDS"):
+    # Pick up lexicon.json edits without restarting the worker
+    REGISTRY.watch(float(os.environ["UTL_LEXICON_WATCH_SECONDS"]))
+
+
+class TurnIn(BaseModel):
+    conversation_id: str
+    text: Optional[str] = None
+    timestamp: Optional[float] = None
+    # Precomputed channel values (linguistic/behavioral/temporal/resilience);
+    # used instead of text feature extraction when given
+    channels: Optional[Dict[str, float]] = None
+
+
+class TurnOut(BaseModel):
+    conversation_id: str
+    turn: int
+    hazard: float
+    crisis: bool
+    cumulative_risk: float
+    lexicon_version: Optional[str] = None
+
+
+class BatchIn(BaseModel):
+    turns: List[TurnIn]
+
+
+class BatchOut(BaseModel):
+    results: List[TurnOut]
+
+
+def score_turn(turn: TurnIn) -> TurnOut:
+    sess = POOL.get(turn.conversation_id)
+    version = None
+    if turn.channels is not None:
+        channels = turn.channels
+    else:
+        with TIMER.stage("features"):
+            feats = sess.features.extract(turn.text or "", turn.timestamp)
+        version = feats.lexicon_version
+        with TIMER.stage("channels"):
+            channels = AGGREGATOR.channels(feats)
+    with TIMER.stage("detector"):
+        hazard, crisis = sess.detector.update(channels)
+    sess.features.observe_hazard(hazard)
+    det = sess.detector
+    return TurnOut(conversation_id=turn.conversation_id, turn=det.turn,
+                   hazard=hazard, crisis=bool(crisis), cumulative_risk=det.theta_t,
+                   lexicon_version=version)
+
+
+# Handlers are async on purpose: scoring is a few microseconds of CPU, so running
+# on the event loop avoids a threadpool hop per request and serializes updates
+# to the same conversation.
+@router.post("/score", response_model=TurnOut)
+async def score(turn: TurnIn) -> TurnOut:
+    return score_turn(turn)
+
+
+@router.post("/score/batch", response_model=BatchOut)
+async def score_batch(batch: BatchIn) -> BatchOut:
+    return BatchOut(results=[score_turn(t) for t in batch.turns])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> str:
+    body = TIMER.render_prometheus()
+    cache = feature_cache()
+    if cache is not None:
+        st = cache.stats()
+        for name in ("hits", "misses", "evictions"):
+            body += (f"# TYPE utl_feature_cache_{name}_total counter\n"
+                     f"utl_feature_cache_{name}_total {st[name]}\n")
+        body += f"# TYPE utl_feature_cache_size gauge\nutl_feature_cache_size {st['size']}\n"
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+
+@router.get("/compare")
+async def alive() -> dict:
+    return {
         "ok": True,
         "runtime": "python",
         "endpoint": "/api/compare",
-        "message": "Python function alive"
-    }
-    return {
-        "statusCode": 200,
-        "headers": {"Content-Type": "application/json"},
-        "body": json.dumps(result)
+        "message": "Python function alive",
+        "sessions": len(POOL),
+        "lexicon_version": REGISTRY.current().version,
     }
+
+
+# Mounted both bare (uvicorn) and under /api (Vercel passes the original path)
+app.include_router(router)
+app.include_router(router, prefix="/api")
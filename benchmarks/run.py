@@ -0,0 +1,270 @@
+"""
+Throughput/latency benchmarks for the UTL hot paths.
+
+Covers UTLDetector.update at several conversation lengths, the same update
+with math vs NumPy scalar operations,
+extract_turn_features at several text lengths and lexicon sizes, the
+loader's batch replay on demo_synthetic.csv tiled to larger sizes, and
+POST /score latency through the ASGI app (skipped without fastapi/httpx).
+
+Usage:
+    python benchmarks/run.py --out benchmarks/results/$(git rev-parse --short HEAD).json
+    python benchmarks/run.py --compare benchmarks/results/old.json --only detector
+
+Each result records the best/median seconds per call over `repeat` rounds;
+--compare prints the median ratio against an earlier JSON file (>1 = slower).
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from utl.detector import UTLDetector  # noqa: E402
+from utl.features import extract_turn_features  # noqa: E402
+from utl.lexicon import DEFAULT_LEXICON, REGISTRY  # noqa: E402
+
+DATA = ROOT / "data" / "demo_synthetic.csv"
+WORDS = ("i feel so tired of everything and nobody cares about me anymore "
+         "maybe tomorrow will be different but i doubt it").split()
+
+
+def measure(fn: Callable[[], object], number: int = 1, repeat: int = 5) -> Dict[str, float]:
+    """Seconds per call of `fn` (best and median over `repeat` rounds of `number` calls)."""
+    fn()  # warm-up: lazy imports, lexicon compilation, allocator
+    rounds = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - t0) / number)
+    return dict(best=min(rounds), median=statistics.median(rounds), number=number, repeat=repeat)
+
+
+def _turns(n: int, seed: int = 0) -> List[Dict[str, float]]:
+    rng = np.random.default_rng(seed)
+    X = rng.random((n, 4))
+    return [dict(linguistic=a, behavioral=b, temporal=c, resilience=d) for a, b, c, d in X.tolist()]
+
+
+def _text(n_words: int) -> str:
+    return " ".join(WORDS[i % len(WORDS)] for i in range(n_words))
+
+
+def bench_detector(repeat: int) -> Dict[str, dict]:
+    out = {}
+    for n in (10, 100, 1000, 10000):
+        turns = _turns(n)
+
+        def run(turns=turns):
+            det = UTLDetector()
+            for f in turns:
+                det.update(f)
+
+        r = measure(run, number=max(1, 10000 // n), repeat=repeat)
+        r.update(turns=n, per_turn=r["median"] / n)
+        out[f"detector.update[{n}]"] = r
+    return out
+
+
+class _NumpyScalarDetector(UTLDetector):
+    """UTLDetector with the pre-scalar-math update: np.exp and np.clip per turn."""
+
+    def update(self, features, with_recovery=False):
+        self.turn += 1
+        r_t = (features.get('linguistic', 0.0) +
+               features.get('behavioral', 0.0) +
+               features.get('temporal', 0.0)) / 3.0
+        self.v_t = self.alpha * (r_t ** 2) + (1 - self.alpha) * self.v_t
+        if self._n:
+            theta_adapt = self.theta_mult * (self._hazard_variance() + 1e-6)
+        else:
+            theta_adapt = 1.0
+        s = 0.5 * theta_adapt if theta_adapt > 0 else 0.5
+        with np.errstate(over="ignore"):
+            h_t = 1.0 / (1.0 + np.exp(-(self.v_t - theta_adapt) / max(s, 1e-6)))
+        h_net = h_t - self.beta * features.get('resilience', 0.0)
+        h_net = float(np.clip(h_net, 0.0, 1.0))
+        self.theta_t += h_net
+        crisis = h_net > self.tau
+        self.history.append((self.turn, h_net, crisis))
+        self._push_hazard(h_net)
+        self._push_recent(h_net)
+        if with_recovery:
+            return h_net, crisis, self.get_recovery_window()
+        return h_net, crisis
+
+
+def bench_scalar(repeat: int) -> Dict[str, dict]:
+    """UTLDetector.update (math scalars) vs the same update with NumPy scalar ops."""
+    turns = _turns(1000, seed=1)
+    hazards = {}
+    for cls in (UTLDetector, _NumpyScalarDetector):
+        det = cls()
+        hazards[cls] = [det.update(f)[0] for f in turns]
+    np.testing.assert_allclose(hazards[UTLDetector], hazards[_NumpyScalarDetector], rtol=1e-12)
+
+    out = {}
+    for name, cls in (("math", UTLDetector), ("numpy", _NumpyScalarDetector)):
+        def run(cls=cls):
+            det = cls()
+            for f in turns:
+                det.update(f)
+
+        r = measure(run, number=10, repeat=repeat)
+        r.update(turns=len(turns), per_turn=r["median"] / len(turns))
+        out[f"scalar.update[{name}]"] = r
+    out["scalar.update[math]"]["speedup"] = (
+        out["scalar.update[numpy]"]["median"] / out["scalar.update[math]"]["median"])
+    return out
+
+
+def _scaled_lexicon(n_phrases: int) -> dict:
+    """Default lexicon padded with synthetic phrases to about `n_phrases` entries."""
+    lex = {k: list(v) for k, v in DEFAULT_LEXICON.items()}
+    cats = list(lex)
+    i = 0
+    while sum(len(v) for v in lex.values()) < n_phrases:
+        lex[cats[i % len(cats)]].append(f"synthetic phrase {i:06d}")
+        i += 1
+    return lex
+
+
+def bench_features(repeat: int) -> Dict[str, dict]:
+    out = {}
+    saved = (REGISTRY.path, REGISTRY.compiled)
+    base = sum(len(v) for v in DEFAULT_LEXICON.values())
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for size in (base, 1000, 10000):
+                path = Path(tmp) / f"lexicon_{size}.json"
+                path.write_text(json.dumps(_scaled_lexicon(size)), encoding="utf-8")
+                REGISTRY.configure(path=str(path))
+                for words in (10, 100, 1000):
+                    text = _text(words)
+                    r = measure(lambda text=text: extract_turn_features(text, 3, 5.0),
+                                number=max(1, 20000 // words), repeat=repeat)
+                    r.update(words=words, lexicon_phrases=size)
+                    out[f"features.extract[words={words},lexicon={size}]"] = r
+    finally:
+        REGISTRY.configure(*saved)
+    return out
+
+
+def _tiled(df: pd.DataFrame, factor: int) -> pd.DataFrame:
+    """Copy the dataset `factor` times with disjoint conversation ids."""
+    span = int(df["conversation_id"].max()) + 1
+    parts = [df.assign(conversation_id=df["conversation_id"] + k * span) for k in range(factor)]
+    return pd.concat(parts, ignore_index=True)
+
+
+def bench_loader(repeat: int) -> Dict[str, dict]:
+    from experiments.crisis_chat_loader import DEFAULTS, score_frame
+
+    base = pd.read_csv(DATA).sort_values(["conversation_id", "turn"]).reset_index(drop=True)
+    out = {}
+    for factor in (1, 10, 100):
+        df = _tiled(base, factor)
+        r = measure(lambda df=df: score_frame(df, DEFAULTS), repeat=repeat)
+        r.update(rows=len(df), rows_per_s=len(df) / r["median"])
+        out[f"loader.score_frame[x{factor}]"] = r
+    return out
+
+
+def bench_api(repeat: int) -> Dict[str, dict]:
+    try:
+        from fastapi.testclient import TestClient
+
+        from api.compare import app
+    except ImportError as e:
+        print(f"skipping api benchmarks: {e}", file=sys.stderr)
+        return {}
+
+    client = TestClient(app)
+    counter = iter(range(10 ** 9))
+
+    def post():
+        r = client.post("/score", json={"conversation_id": f"bench-{next(counter) % 1000}",
+                                        "text": "nobody cares, I feel alone tonight"})
+        r.raise_for_status()
+
+    r = measure(post, number=200, repeat=repeat)
+    # Per-request tail latency (the means above hide it)
+    lat = []
+    for _ in range(1000):
+        t0 = time.perf_counter()
+        post()
+        lat.append(time.perf_counter() - t0)
+    r.update(p50=float(np.percentile(lat, 50)), p95=float(np.percentile(lat, 95)),
+             p99=float(np.percentile(lat, 99)))
+    return {"api.post_score": r}
+
+
+SUITES = {
+    "detector": bench_detector,
+    "scalar": bench_scalar,
+    "features": bench_features,
+    "loader": bench_loader,
+    "api": bench_api,
+}
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict]) -> None:
+    print(f"{'benchmark':<50} {'old':>11} {'new':>11} {'ratio':>7}")
+    for name, r in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        ratio = r["median"] / old["median"]
+        print(f"{name:<50} {old['median']:11.3e} {r['median']:11.3e} {ratio:7.2f}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="UTL hot-path benchmarks")
+    ap.add_argument("--only", default=",".join(SUITES),
+                    help="comma-separated suites: " + ", ".join(SUITES))
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--out", default="benchmarks/results/latest.json")
+    ap.add_argument("--compare", help="earlier results JSON to compare medians against")
+    args = ap.parse_args(argv)
+
+    results: Dict[str, dict] = {}
+    for name in args.only.split(","):
+        results.update(SUITES[name.strip()](args.repeat))
+    for name, r in results.items():
+        print(f"{name:<50} median {r['median']:.3e} s  best {r['best']:.3e} s")
+
+    meta = dict(commit=_commit(), python=platform.python_version(), numpy=np.__version__,
+                platform=platform.platform(), cpus=os.cpu_count(),
+                timestamp=time.strftime("%Y-%m-%dT%H:%M:%S"))
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(dict(meta=meta, results=results), indent=2), encoding="utf-8")
+    print("Saved:", out)
+
+    if args.compare:
+        compare(results, json.loads(Path(args.compare).read_text(encoding="utf-8"))["results"])
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,27 @@
 """
 Ablation studies for UTL (synthetic demo).
 - Loads data/demo_synthetic.csv
-- Runs detector with selected feature channels zeroed out.
+- Runs detector with selected feature channels zeroed out (or reweighted).
 - Saves table CSV with metrics for each ablation setting.
+
+All variants are scored in one vectorized pass (utl.batch.run_variants), with
+detector state reset at every conversation boundary. Extra variants can be
+given as a CSV with columns name,linguistic,behavioral,temporal,resilience:
+    python experiments/ablations.py --variants my_masks.csv
 """
+import argparse
 from pathlib import Path
-import pandas as pd
+
 import numpy as np
-from utl.detector import UTLDetector
+import pandas as pd
+
+from utl.batch import run_variants
+from utl.metrics import evaluate
 
 DATA = Path("data/demo_synthetic.csv")
 OUT = Path("results/ablations.csv")
 THR = 0.68
+CHANNEL_COLS = ["linguistic_hazard", "behavioral_hazard", "temporal_hazard", "resilience_score"]
 
 ABLATIONS = [
     ("full_model", {"ling":True, "beh":True, "tmp":True, "res":True}),
@@ -21,39 +31,40 @@ ABLATIONS = [
     ("no_resilience", {"ling":True, "beh":True, "tmp":True, "res":False}),
 ]
 
-def evaluate(y_true, y_score, thr=THR):
-    y_pred = (y_score > thr).astype(int)
-    tp = int(((y_pred==1) & (y_true==1)).sum())
-    fp = int(((y_pred==1) & (y_true==0)).sum())
-    tn = int(((y_pred==0) & (y_true==0)).sum())
-    fn = int(((y_pred==0) & (y_true==1)).sum())
-    prec = tp / (tp+fp) if (tp+fp)>0 else 0.0
-    rec = tp / (tp+fn) if (tp+fn)>0 else 0.0
-    acc = (tp+tn) / max(1, len(y_true))
-    f1 = 2*prec*rec/(prec+rec) if (prec+rec)>0 else 0.0
-    return dict(precision=prec, recall=rec, f1=f1, accuracy=acc, tp=tp, fp=fp, tn=tn, fn=fn)
-
-def run_variant(name, flags, df):
-    det = UTLDetector()
-    hazards = []
-    for _, row in df.iterrows():
-        ling = float(row["linguistic_hazard"]) if flags["ling"] else 0.0
-        beh = float(row["behavioral_hazard"]) if flags["beh"] else 0.0
-        tmp = float(row["temporal_hazard"]) if flags["tmp"] else 0.0
-        res = float(row["resilience_score"]) if flags["res"] else 0.0
-        h, c = det.update({"linguistic": ling, "behavioral": beh, "temporal": tmp, "resilience": res})
-        hazards.append(h)
-    m = evaluate(df["crisis_label"].values.astype(int), np.array(hazards), thr=THR)
-    m.update(name=name, mean_hazard=float(np.mean(hazards)), max_hazard=float(np.max(hazards)))
-    return m
+def mask_weights(flags):
+    return [float(flags[k]) for k in ("ling", "beh", "tmp", "res")]
+
+def load_variants(path):
+    v = pd.read_csv(path)
+    channels = ("linguistic", "behavioral", "temporal", "resilience")
+    return [(str(r["name"]), [float(r[c]) for c in channels])
+            for _, r in v.iterrows()]
+
+def run_all(variants, df):
+    names = [n for n, _ in variants]
+    W = np.array([w for _, w in variants], dtype=np.float64)
+    H = run_variants(df["conversation_id"].values, df["turn"].values,
+                     df[CHANNEL_COLS].values, W)
+    y = df["crisis_label"].values.astype(int)
+    rows = []
+    for k, name in enumerate(names):
+        m = evaluate(y, H[:, k], thr=THR)
+        m.update(name=name, mean_hazard=float(H[:, k].mean()), max_hazard=float(H[:, k].max()))
+        rows.append(m)
+    return rows
 
 def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--variants", default="",
+                    help="CSV of extra variants (name + 4 channel weights)")
+    args = ap.parse_args()
+
     assert DATA.exists(), f"Missing {DATA}"
     df = pd.read_csv(DATA).sort_values(["conversation_id","turn"]).reset_index(drop=True)
-    rows = []
-    for name, flags in ABLATIONS:
-        rows.append(run_variant(name, flags, df))
-    pd.DataFrame(rows).to_csv(OUT, index=False)
+    variants = [(name, mask_weights(flags)) for name, flags in ABLATIONS]
+    if args.variants:
+        variants += load_variants(args.variants)
+    pd.DataFrame(run_all(variants, df)).to_csv(OUT, index=False)
     print("Saved", OUT)
 
 if __name__ == "__main__":
@@ -1,14 +1,38 @@
 """
 Generic crisis chat loader + evaluator.
 Usage:
-    python experiments/crisis_chat_loader.py --file path/to.csv --map linguistic=colA,behavioral=colB,temporal=colC,resilience=colD,label=labelCol,conv=conversation_id,turn=turn
+    python experiments/crisis_chat_loader.py --file path/to.csv --map MAP
+where MAP is one comma-separated string, e.g.
+    linguistic=colA,behavioral=colB,temporal=colC,resilience=colD,label=labelCol,
+    conv=conversation_id,turn=turn   (written without the line break)
 If --map omitted, defaults to demo_synthetic.csv schema.
+Turn-level output goes to the memory-mapped results store loader_turns/
+(see utl.results), or to loader_turns.csv with --format csv.
+With --workers N, conversations are split into N contiguous shards scored in a
+process pool and merged in shard order, so the output is identical to
+--workers 1 (with --format csv each shard writes its own part file).
+With --stream, input already sorted by (conv, turn) is read in --chunksize
+chunks and the output is appended per chunk, so memory stays bounded by
+the chunk size (plus the longest conversation) instead of the file size.
+--stream runs in-process (it cannot be combined with --workers) and only
+accumulates confusion counts, so pr_auc and roc_auc are reported as nan in
+its summary.
+Parquet input (.parquet/.pq, requires pyarrow) reads only the mapped columns.
+With --timing (or UTL_TIMING=1) a per-stage timing table is printed at the end.
 """
-from pathlib import Path
 import argparse
-import pandas as pd
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
 import numpy as np
-from utl.detector import UTLDetector
+import pandas as pd
+
+from utl.batch import UTLBatchDetector
+from utl.metrics import confusion, metrics_from_counts, summarize
+from utl.results import ResultsWriter, check_dtype, write_results
+from utl.timing import TIMER
 
 DEFAULTS = {
     "conv": "conversation_id",
@@ -30,63 +54,212 @@ def parse_map(s: str):
             m[k.strip()] = v.strip()
     return m
 
-def evaluate(y_true, y_score, thr=0.68):
-    y_pred = (y_score > thr).astype(int)
-    tp = int(((y_pred==1) & (y_true==1)).sum())
-    fp = int(((y_pred==1) & (y_true==0)).sum())
-    tn = int(((y_pred==0) & (y_true==0)).sum())
-    fn = int(((y_pred==0) & (y_true==1)).sum())
-    prec = tp / (tp+fp) if (tp+fp)>0 else 0.0
-    rec = tp / (tp+fn) if (tp+fn)>0 else 0.0
-    acc = (tp+tn) / max(1, len(y_true))
-    f1 = 2*prec*rec/(prec+rec) if (prec+rec)>0 else 0.0
-    return dict(precision=prec, recall=rec, f1=f1, accuracy=acc, tp=tp, fp=fp, tn=tn, fn=fn)
+def is_parquet(path) -> bool:
+    return Path(path).suffix.lower() in (".parquet", ".pq")
+
+def read_table(path, cols) -> pd.DataFrame:
+    if is_parquet(path):
+        return pd.read_parquet(path, columns=cols)
+    return pd.read_csv(path, usecols=cols)
+
+def iter_chunks(path, cols, chunksize):
+    """Yield DataFrames of at most `chunksize` rows with only `cols` loaded."""
+    if is_parquet(path):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=cols):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=cols, chunksize=chunksize)
+
+def _timed(it, stage):
+    """Yield from `it`, timing each next() as `stage`."""
+    it = iter(it)
+    while True:
+        with TIMER.stage(stage):
+            item = next(it, None)
+        if item is None:
+            return
+        yield item
+
+def run_streaming(path, cols, mp: dict, chunksize: int, out_path: Path, thr: float,
+                  fmt: str = "npy") -> dict:
+    """
+    Score pre-sorted input chunk by chunk; returns confusion counts at `thr`.
+
+    The last conversation of each chunk may continue in the next one, so its
+    rows are held back and prepended to the next chunk; every conversation is
+    therefore scored in one piece and the output equals the in-memory run.
+    """
+    counts = dict(tp=0, fp=0, tn=0, fn=0)
+    carry = None
+    header = True
+    store = ResultsWriter(out_path, conv_col=mp["conv"]) if fmt == "npy" else None
+
+    def flush(frame):
+        nonlocal header
+        res = score_frame(frame, mp)
+        with TIMER.stage("write"):
+            if store is not None:
+                store.append(res)
+            else:
+                res.to_csv(out_path, mode="w" if header else "a", index=False, header=header)
+        header = False
+        with TIMER.stage("metrics"):
+            for k, v in confusion(res["label"].values, res["hazard"].values, thr).items():
+                counts[k] += v
+
+    for chunk in _timed(iter_chunks(path, cols, chunksize), "load"):
+        if chunk.empty:
+            continue
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        # The carried rows come first, so order is also checked across chunk edges
+        conv, turn = chunk[mp["conv"]].values, chunk[mp["turn"]].values
+        same = conv[1:] == conv[:-1]
+        if (conv[1:] < conv[:-1]).any() or (turn[1:] < turn[:-1])[same].any():
+            raise SystemExit("--stream requires input sorted by conversation (and turn)")
+        # Sorted input: the last conversation is a contiguous suffix of the chunk
+        first_held = len(conv) - int((conv == conv[-1]).sum())
+        carry = chunk.iloc[first_held:]
+        if first_held:
+            flush(chunk.iloc[:first_held])
+    if carry is not None and len(carry):
+        flush(carry)
+    elif header:
+        empty = pd.DataFrame({mp["conv"]: np.empty(0, np.int64), mp["turn"]: np.empty(0, np.int64),
+                              "hazard": np.empty(0), "label": np.empty(0, np.int64)})
+        if store is not None:
+            store.append(empty)
+        else:
+            empty.to_csv(out_path, index=False)
+    if store is not None:
+        store.close()
+    return counts
+
+def score_frame(df: pd.DataFrame, mp: dict) -> pd.DataFrame:
+    """Score a (conv, turn)-sorted frame; returns the loader_turns rows."""
+    with TIMER.stage("detector"):
+        hazards, _ = UTLBatchDetector().run(
+            df[mp["conv"]].values,
+            df[mp["turn"]].values,
+            df[mp["linguistic"]].values,
+            df[mp["behavioral"]].values,
+            df[mp["temporal"]].values,
+            df[mp["resilience"]].values,
+        )
+    return pd.DataFrame({
+        mp["conv"]: df[mp["conv"]].values,
+        mp["turn"]: df[mp["turn"]].astype(int).values,
+        "hazard": hazards,
+        "label": df[mp["label"]].astype(int).values,
+    })
+
+def shard_bounds(conv: np.ndarray, n_shards: int):
+    """Split sorted rows into <= n_shards contiguous row ranges on conversation boundaries."""
+    starts = np.flatnonzero(np.r_[True, conv[1:] != conv[:-1]])
+    targets = np.linspace(0, len(conv), n_shards + 1)[1:-1]
+    if not len(starts):
+        return []
+    # A target past the last conversation start (long trailing conversation) cuts there
+    idx = np.minimum(np.searchsorted(starts, targets), len(starts) - 1)
+    cuts = starts[idx]
+    edges = np.unique(np.r_[0, cuts, len(conv)])
+    return list(zip(edges[:-1], edges[1:], strict=True))
+
+def _score_shard(job):
+    shard_id, shard, mp, part_path = job
+    res = score_frame(shard, mp)
+    if part_path is not None:
+        res.to_csv(part_path, index=False, header=(shard_id == 0))
+    return res
+
+def run_sharded(df: pd.DataFrame, mp: dict, workers: int, out_path: Path,
+                fmt: str = "npy") -> pd.DataFrame:
+    """Score conversation shards in a process pool and write their rows in order."""
+    bounds = shard_bounds(df[mp["conv"]].values, workers)
+    if fmt == "npy":
+        check_dtype(mp["conv"], df[mp["conv"]].dtype, conv=True)  # fail before scoring
+        jobs = [(i, df.iloc[a:b], mp, None) for i, (a, b) in enumerate(bounds)]
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool, \
+                ResultsWriter(out_path, conv_col=mp["conv"]) as store:
+            parts = []
+            for res in pool.map(_score_shard, jobs):
+                store.append(res)
+                parts.append(res)
+        return pd.concat(parts, ignore_index=True)
+
+    part_dir = out_path.parent / (out_path.stem + "_parts")
+    part_dir.mkdir(parents=True, exist_ok=True)
+    jobs = [(i, df.iloc[a:b], mp, part_dir / f"part-{i:05d}.csv")
+            for i, (a, b) in enumerate(bounds)]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+        parts = list(pool.map(_score_shard, jobs))
+    with open(out_path, "wb") as out:
+        for _, _, _, part_path in jobs:
+            with open(part_path, "rb") as f:
+                shutil.copyfileobj(f, out)
+    shutil.rmtree(part_dir)
+    return pd.concat(parts, ignore_index=True)
 
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("--file", required=True, help="CSV path")
-    ap.add_argument("--map", default="", help="column mapping e.g. linguistic=X,behavioral=Y,temporal=Z,resilience=R,label=Y,conv=C,turn=T")
+    ap.add_argument("--file", required=True, help="CSV or Parquet path")
+    ap.add_argument("--map", default="", help="column mapping e.g. linguistic=X,behavioral=Y,"
+                    "temporal=Z,resilience=R,label=Y,conv=C,turn=T")
     ap.add_argument("--thr", type=float, default=0.68, help="hazard threshold")
     ap.add_argument("--outdir", default="results", help="output directory")
+    ap.add_argument("--workers", type=int, default=1, help="process-pool shards (1 = in-process)")
+    ap.add_argument("--stream", action="store_true",
+                    help="chunked ingestion of input pre-sorted by conv, turn")
+    ap.add_argument("--chunksize", type=int, default=100_000, help="rows per chunk with --stream")
+    ap.add_argument("--format", choices=("npy", "csv"), default="npy",
+                    help="turn-level output: memory-mapped store (npy) or loader_turns.csv")
+    ap.add_argument("--timing", action="store_true", help="print per-stage timings")
     args = ap.parse_args()
+    if args.stream and args.workers > 1:
+        ap.error("--stream runs in-process; it cannot be combined with --workers")
+    if args.timing:
+        TIMER.enable()
 
     mp = parse_map(args.map)
-    df = pd.read_csv(args.file).sort_values([mp["conv"], mp["turn"]]).reset_index(drop=True)
-
-    outdir = Path(args.outdir); outdir.mkdir(parents=True, exist_ok=True)
-    rows = []
-    det = None
-    last_conv = None
-    for _, row in df.iterrows():
-        conv = row[mp["conv"]]
-        if last_conv is None or conv != last_conv:
-            det = UTLDetector()
-            last_conv = conv
-        feats = {
-            "linguistic": float(row[mp["linguistic"]]),
-            "behavioral": float(row[mp["behavioral"]]),
-            "temporal": float(row[mp["temporal"]]),
-            "resilience": float(row[mp["resilience"]]),
-        }
-        hazard, crisis = det.update(feats)
-        rows.append({
-            mp["conv"]: conv,
-            mp["turn"]: int(row[mp["turn"]]),
-            "hazard": hazard,
-            "label": int(row[mp["label"]]),
-        })
-    res = pd.DataFrame(rows)
-    res.to_csv(outdir / "loader_turns.csv", index=False)
-
-    metrics = evaluate(res["label"].values, res["hazard"].values, thr=args.thr)
+    keys = ("conv", "turn", "linguistic", "behavioral", "temporal", "resilience", "label")
+    cols = [mp[k] for k in keys]
+    outdir = Path(args.outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    out_path = outdir / ("loader_turns" if args.format == "npy" else "loader_turns.csv")
+
+    if args.stream:
+        counts = run_streaming(args.file, cols, mp, args.chunksize, out_path, args.thr, args.format)
+        metrics = metrics_from_counts(**counts)
+        # AUCs need every score at once; keep the summary keys of the in-memory path
+        metrics.update(pr_auc=float("nan"), roc_auc=float("nan"))
+    else:
+        with TIMER.stage("load"):
+            df = read_table(args.file, cols).sort_values([mp["conv"], mp["turn"]])
+            df = df.reset_index(drop=True)
+        if args.workers > 1:
+            # Stages inside the worker processes are not recorded here
+            with TIMER.stage("sharded"):
+                res = run_sharded(df, mp, args.workers, out_path, args.format)
+        else:
+            res = score_frame(df, mp)
+            with TIMER.stage("write"):
+                if args.format == "npy":
+                    write_results(out_path, res, conv_col=mp["conv"])
+                else:
+                    res.to_csv(out_path, index=False)
+        with TIMER.stage("metrics"):
+            metrics = summarize(res["label"].values, res["hazard"].values, thr=args.thr)
 
     with open(outdir / "loader_summary.txt", "w", encoding="utf-8") as f:
         f.write("=== UTL Loader Summary ===\n")
         for k, v in metrics.items():
             f.write(f"- {k}: {v}\n")
 
-    print("Saved:", outdir / "loader_turns.csv")
+    print("Saved:", out_path)
     print("Saved:", outdir / "loader_summary.txt")
+    if TIMER.enabled:
+        print(TIMER.summary())
 
 if __name__ == "__main__":
     main()
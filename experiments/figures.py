@@ -1,20 +1,25 @@
 """
 Generate basic figures from synthetic demo using matplotlib.
-Saves into figures/ directory.
+Saves into figures/ directory. Reads the memory-mapped results store
+written by crisis_chat.py, so only the columns and rows a figure uses are paged in.
 """
 from pathlib import Path
-import numpy as np
-import pandas as pd
+
 import matplotlib.pyplot as plt
+import numpy as np
+
+from utl.metrics import threshold_sweep
+from utl.results import is_store, open_results
 
 FIG_DIR = Path("figures")
-RES_PATH = Path("results/crisis_turns.csv")
+RES_PATH = Path("results/crisis_turns")
 FIG_DIR.mkdir(parents=True, exist_ok=True)
 
 def fig_hazard_hist():
-    df = pd.read_csv(RES_PATH)
+    res = open_results(RES_PATH)
     plt.figure()
-    df["hazard"].hist(bins=30)
+    plt.hist(res["hazard"], bins=30)
+    plt.grid(True)
     plt.title("Hazard Distribution (Per-Turn)")
     plt.xlabel("Hazard")
     plt.ylabel("Frequency")
@@ -25,15 +30,19 @@ def fig_hazard_hist():
     print("Saved:", p)
 
 def fig_sample_conversation(conv_id: int = 0):
-    df = pd.read_csv(RES_PATH)
-    g = df[df["conversation_id"]==conv_id].sort_values("turn")
-    if g.empty:
-        conv_id = int(df["conversation_id"].iloc[0])
-        g = df[df["conversation_id"]==conv_id].sort_values("turn")
+    res = open_results(RES_PATH)
+    try:
+        g = res.conversation(conv_id)
+    except KeyError:
+        if not len(res.conversations):
+            print("No conversations in", RES_PATH)
+            return
+        conv_id = res.conversations[0].item()
+        g = res.conversation(conv_id)
     plt.figure()
-    plt.plot(g["turn"].values, g["hazard"].values, marker="o")
+    plt.plot(g["turn"], g["hazard"], marker="o")
     plt.axhline(0.68, linestyle="--")
-    plt.title(f"Hazard over Turns (Conversation {int(g['conversation_id'].iloc[0])})")
+    plt.title(f"Hazard over Turns (Conversation {conv_id})")
     plt.xlabel("Turn")
     plt.ylabel("Hazard")
     plt.tight_layout()
@@ -43,20 +52,10 @@ def fig_sample_conversation(conv_id: int = 0):
     print("Saved:", p)
 
 def fig_threshold_sweep():
-    df = pd.read_csv(RES_PATH)
+    res = open_results(RES_PATH)
     thr_grid = np.linspace(0.1, 0.9, 17)
-    precisions, recalls = [], []
-    y_true = df["crisis_label"].values.astype(int)
-    scores = df["hazard"].values
-    for thr in thr_grid:
-        y_pred = (scores > thr).astype(int)
-        tp = ((y_pred==1) & (y_true==1)).sum()
-        fp = ((y_pred==1) & (y_true==0)).sum()
-        fn = ((y_pred==0) & (y_true==1)).sum()
-        prec = tp / (tp+fp) if (tp+fp)>0 else 0.0
-        rec = tp / (tp+fn) if (tp+fn)>0 else 0.0
-        precisions.append(prec)
-        recalls.append(rec)
+    sweep = threshold_sweep(res["crisis_label"], res["hazard"], thr_grid)
+    precisions, recalls = sweep["precision"], sweep["recall"]
 
     plt.figure()
     plt.plot(thr_grid, precisions, marker="o", label="Precision")
@@ -72,8 +71,8 @@ def fig_threshold_sweep():
     print("Saved:", p)
 
 if __name__ == "__main__":
-    if not RES_PATH.exists():
-        print("Missing results/crisis_turns.csv. Run: python experiments/crisis_chat.py")
+    if not is_store(RES_PATH):
+        print("Missing results/crisis_turns/. Run: python experiments/crisis_chat.py")
     else:
         fig_hazard_hist()
         fig_sample_conversation()
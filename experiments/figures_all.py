@@ -1,11 +1,11 @@
 """
 Generate all figures (synthetic + paper-style) in one pass.
-Requires results/crisis_turns.csv. If missing, runs crisis_chat first.
+Requires results/crisis_turns/. If missing, runs crisis_chat first.
 """
-from pathlib import Path
 import runpy
+from pathlib import Path
 
-if not Path('results/crisis_turns.csv').exists():
+if not Path('results/crisis_turns/meta.json').exists():
     runpy.run_path('experiments/crisis_chat.py', run_name='__main__')
 
 # Standard figures
@@ -3,17 +3,20 @@ Figures for paper-style export (from synthetic results).
 Saves names that are convenient to reference in the manuscript.
 """
 from pathlib import Path
+
 import matplotlib.pyplot as plt
-import pandas as pd
-import numpy as np
 
-RES = Path("results/crisis_turns.csv")
-FIG = Path("figures"); FIG.mkdir(parents=True, exist_ok=True)
+from utl.results import is_store, open_results
+
+RES = Path("results/crisis_turns")
+FIG = Path("figures")
+FIG.mkdir(parents=True, exist_ok=True)
 
 def figure_6_hazard_hist():
-    df = pd.read_csv(RES)
+    res = open_results(RES)
     plt.figure()
-    df["hazard"].hist(bins=30)
+    plt.hist(res["hazard"], bins=30)
+    plt.grid(True)
     plt.title("Hazard Distribution (Per-Turn)")
     plt.xlabel("Hazard")
     plt.ylabel("Frequency")
@@ -24,15 +27,19 @@ def figure_6_hazard_hist():
     print("Saved:", p)
 
 def figure_12_conv_curve(conv_id:int = 0):
-    df = pd.read_csv(RES)
-    g = df[df["conversation_id"]==conv_id].sort_values("turn")
-    if g.empty and len(df):
-        conv_id = int(df["conversation_id"].iloc[0])
-        g = df[df["conversation_id"]==conv_id].sort_values("turn")
+    res = open_results(RES)
+    try:
+        g = res.conversation(conv_id)
+    except KeyError:
+        if not len(res.conversations):
+            print("No conversations in", RES)
+            return
+        conv_id = res.conversations[0].item()
+        g = res.conversation(conv_id)
     plt.figure()
-    plt.plot(g["turn"].values, g["hazard"].values, marker="o")
+    plt.plot(g["turn"], g["hazard"], marker="o")
     plt.axhline(0.68, linestyle="--")
-    plt.title(f"Hazard over Turns (Conversation {int(g['conversation_id'].iloc[0])})")
+    plt.title(f"Hazard over Turns (Conversation {conv_id})")
     plt.xlabel("Turn")
     plt.ylabel("Hazard")
     plt.tight_layout()
@@ -42,8 +49,8 @@ def figure_12_conv_curve(conv_id:int = 0):
     print("Saved:", p)
 
 if __name__ == "__main__":
-    if not RES.exists():
-        print("Missing results/crisis_turns.csv; run experiments/crisis_chat.py first.")
+    if not is_store(RES):
+        print("Missing results/crisis_turns/; run experiments/crisis_chat.py first.")
     else:
         figure_6_hazard_hist()
         figure_12_conv_curve()
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utl.batch import UTLBatchDetector
+from utl.detector import UTLDetector
+
+
+def _per_row(df, **kw):
+    out = np.zeros(len(df))
+    for _, g in df.groupby("conv"):
+        det = UTLDetector(**kw)
+        for idx, row in g.sort_values("turn").iterrows():
+            out[idx] = det.update({"linguistic": row.l, "behavioral": row.b,
+                                   "temporal": row.t, "resilience": row.r})[0]
+    return out
+
+
+def _frame(seed=0):
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(1, 40, size=25)
+    conv = np.repeat(np.arange(25), lengths)
+    turn = np.concatenate([np.arange(1, n + 1) for n in lengths])
+    df = pd.DataFrame({"conv": conv, "turn": turn, "l": rng.random(len(conv)),
+                       "b": rng.random(len(conv)), "t": rng.random(len(conv)),
+                       "r": 0.3 * rng.random(len(conv))})
+    return df.sample(frac=1.0, random_state=seed).reset_index(drop=True)
+
+
+def test_batch_matches_streaming_detector():
+    df = _frame()
+    h, c = UTLBatchDetector().run(df.conv, df.turn, df.l, df.b, df.t, df.r)
+    ref = _per_row(df)
+    assert np.allclose(h, ref, atol=1e-12)
+    assert np.array_equal(c, ref > 0.68)
+
+
+def test_batch_window_matches_streaming_detector():
+    df = _frame(seed=3)
+    h, _ = UTLBatchDetector(window=7).run(df.conv, df.turn, df.l, df.b, df.t, df.r)
+    assert np.allclose(h, _per_row(df, window=7), atol=1e-12)
+
+
+def test_batch_exp_overflow_is_silent(recwarn):
+    # alpha > 1 drives the EWMA negative after a spike, so -z overflows exp
+    df = _frame(seed=7)
+    df.loc[df.turn % 3 != 1, ["l", "b", "t"]] = 0.0
+    with np.errstate(over="raise", invalid="raise", divide="raise"):
+        h, _ = UTLBatchDetector(alpha=1.9, jit=False).run(df.conv, df.turn, df.l, df.b,
+                                                          df.t, df.r)
+    assert np.allclose(h, _per_row(df, alpha=1.9), atol=1e-12)
+    assert not recwarn.list
+
+
+def test_variants_match_individual_runs_with_resets():
+    from utl.batch import run_variants
+
+    df = _frame(seed=5)
+    X = df[["l", "b", "t", "r"]].values
+    W = np.array([[1, 1, 1, 1], [0, 1, 1, 1], [1, 1, 1, 0], [0.5, 2.0, 1.0, 0.3]])
+    H = run_variants(df.conv, df.turn, X, W, chunk=3)
+    assert H.shape == (len(df), 4)
+    det = UTLBatchDetector()
+    for k, w in enumerate(W):
+        ref, _ = det.run(df.conv, df.turn, *(X * w).T)
+        assert np.allclose(H[:, k], ref, atol=1e-12)
+
+
+def test_kernel_matches_numpy_path():
+    from utl.kernels import HAVE_NUMBA, hazard_scan
+
+    df = _frame(seed=5).sort_values(["conv", "turn"]).reset_index(drop=True)
+    offsets = np.r_[0, np.cumsum(df.groupby("conv").size().values)]
+    X = df[["l", "b", "t", "r"]].values
+    for window in (None, 4):
+        det = UTLBatchDetector(window=window, jit=False)
+        ref, _ = det.run(df.conv, df.turn, df.l, df.b, df.t, df.r)
+        for jit in (False, True) if HAVE_NUMBA else (False,):
+            h, theta = hazard_scan(offsets, X, window=window, jit=jit)
+            assert np.allclose(h, ref, atol=1e-12)
+            assert np.allclose(theta, det.theta_t, atol=1e-9)
+    assert hazard_scan(np.array([0]), np.zeros((0, 4)), jit=False)[0].shape == (0,)
+
+
+def test_kernel_import_leaves_numba_config_alone():
+    import os
+    import subprocess
+    import sys
+
+    pytest.importorskip("numba")
+    code = ("import numba\n"
+            "layer = numba.config.THREADING_LAYER\n"
+            "import utl.kernels\n"
+            "assert numba.config.THREADING_LAYER == layer, numba.config.THREADING_LAYER\n")
+    env = {k: v for k, v in os.environ.items() if k != "NUMBA_THREADING_LAYER"}
+    subprocess.run([sys.executable, "-c", code], check=True, env=env)
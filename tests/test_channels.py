@@ -0,0 +1,36 @@
+import numpy as np
+
+from utl.channels import CHANNELS, ChannelAggregator, features_to_matrix
+from utl.features import FEATURE_NAMES, extract_turn_features
+
+
+def test_feature_names_match_extractor_order():
+    assert tuple(extract_turn_features("hello", 1)) == FEATURE_NAMES
+
+
+def test_matrix_path_matches_single_turn_path():
+    texts = ["i feel alone tonight", "my friend helps, grateful", "how to get pills, goodbye"]
+    feats = [extract_turn_features(t, i + 1, 10.0) for i, t in enumerate(texts)]
+    agg = ChannelAggregator()
+    X = features_to_matrix(feats)
+    assert X.dtype == np.float32 and X.shape == (3, len(FEATURE_NAMES))
+    C = agg.transform(X)
+    assert C.shape == (3, 4)
+    for row, f in zip(C, feats, strict=True):
+        single = agg.channels(f)
+        assert np.allclose(row, [single[ch] for ch in CHANNELS], atol=1e-6)
+    assert np.allclose(agg.weights.sum(axis=0), 1.0)
+
+
+def test_online_scoring_does_not_import_numpy():
+    import subprocess
+    import sys
+
+    code = ("import sys\n"
+            "from utl.channels import ChannelAggregator\n"
+            "from utl.pool import DetectorPool\n"
+            "sess = DetectorPool().get('c')\n"
+            "ch = ChannelAggregator().channels(sess.features.extract('I feel alone', 0.0))\n"
+            "sess.detector.update(ch)\n"
+            "assert 'numpy' not in sys.modules, 'numpy imported'\n")
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -1,7 +1,141 @@
 from utl.detector import UTLDetector
 
+
 def test_detector_runs():
     d = UTLDetector()
     h, c = d.update({"linguistic": 0.5, "behavioral": 0.3, "temporal": 0.2, "resilience": 0.1})
     assert 0.0 <= h <= 1.0
     assert isinstance(c, bool)
+
+
+def _reference_hazards(turns, window=None):
+    """Original O(n^2) formulation: np.var over the (windowed) hazard history."""
+    import numpy as np
+    v_t, hist, out = 0.0, [], []
+    for f in turns:
+        r_t = (f["linguistic"] + f["behavioral"] + f["temporal"]) / 3.0
+        v_t = 0.15 * r_t ** 2 + 0.85 * v_t
+        vals = hist[-window:] if window else hist
+        theta = 1.5 * (np.var(vals) + 1e-6) if vals else 1.0
+        s = 0.5 * theta
+        h = 1.0 / (1.0 + np.exp(-(v_t - theta) / max(s, 1e-6)))
+        h = float(np.clip(h - 0.8 * f["resilience"], 0.0, 1.0))
+        hist.append(h)
+        out.append(h)
+    return out
+
+
+def _random_turns(n, seed=0):
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    x = rng.random((n, 4))
+    x[:, 3] *= 0.3
+    keys = ("linguistic", "behavioral", "temporal", "resilience")
+    return [dict(zip(keys, row, strict=True)) for row in x]
+
+
+def test_streaming_threshold_matches_full_variance():
+    import numpy as np
+    turns = _random_turns(300)
+    d = UTLDetector()
+    got = [d.update(f)[0] for f in turns]
+    assert np.allclose(got, _reference_hazards(turns), atol=1e-9)
+
+
+def test_windowed_threshold_matches_windowed_variance():
+    import numpy as np
+    turns = _random_turns(300, seed=1)
+    d = UTLDetector(window=20)
+    got = [d.update(f)[0] for f in turns]
+    assert np.allclose(got, _reference_hazards(turns, window=20), atol=1e-9)
+    d.reset()
+    assert d.update(turns[0])[0] == got[0]
+
+
+def test_history_view_and_cap():
+    turns = _random_turns(12, seed=2)
+    full, capped = UTLDetector(), UTLDetector(history_cap=5)
+    for f in turns:
+        assert full.update(f) == capped.update(f)
+    assert len(full.history) == 12 and len(capped.history) == 5
+    assert capped.history == full.history[-5:]
+    assert capped.history[0][0] == 8 and capped.history[-1][0] == 12
+    assert [h for _, h, _ in capped.history] == capped.history.hazards()
+    assert capped.get_recovery_window() == full.get_recovery_window()
+    assert not hasattr(full, "__dict__")
+    capped.reset()
+    assert len(capped.history) == 0 and capped.history == []
+
+
+def _bytes_per_session(build, sessions=50):
+    import tracemalloc
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = [build() for _ in range(sessions)]
+        used = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    assert len(kept) == sessions
+    return used / sessions
+
+
+def test_session_memory():
+    turns = _random_turns(1000, seed=4)
+
+    def detector():
+        d = UTLDetector()
+        for f in turns:
+            d.update(f)
+        return d
+
+    def tuple_history():  # the list of (turn, hazard, crisis) the detector used to keep
+        d = UTLDetector()
+        return [(i, *d.update(f)) for i, f in enumerate(turns, 1)]
+
+    assert _bytes_per_session(detector) * 10 <= _bytes_per_session(tuple_history)
+    idle = UTLDetector(window=20)
+    assert idle.history._hazards is None and idle._rec_vals is None
+    assert idle._window_vals is None
+    assert UTLDetector.from_bytes(idle.to_bytes()).to_bytes() == idle.to_bytes()
+
+
+def test_incremental_recovery_window():
+    import math
+
+    import numpy as np
+
+    turns = _random_turns(60, seed=4)
+    end, ls = UTLDetector(), UTLDetector(recovery_len=7, recovery_slope="lstsq")
+    for f in turns:
+        h, c, w = end.update(f, with_recovery=True)
+        ls.update(f)
+        hs = end.history.hazards()
+        if len(hs) < 5:
+            assert math.isinf(w)
+            continue
+        lam = (hs[-1] - hs[-5]) / 5.0
+        ref = (math.inf if lam <= 0
+               else max(0.0, math.log(max(10.0 - end.theta_t, 1e-6) / 0.1) / lam))
+        assert w == ref or math.isclose(w, ref, rel_tol=1e-9)
+        if len(hs) >= 7:
+            lam = np.polyfit(np.arange(7), ls.history.hazards()[-7:], 1)[0]
+            got = ls.get_recovery_window()
+            if lam > 1e-9:
+                ref = max(0.0, math.log(max(10.0 - ls.theta_t, 1e-6) / 0.1) / lam)
+                assert math.isclose(got, ref, rel_tol=1e-6)
+
+
+def test_recovery_window_parameters():
+    turns = _random_turns(30, seed=5)
+    default, custom = UTLDetector(), UTLDetector(theta_irrev=25.0, epsilon=0.5)
+    differ = 0
+    for f in turns:
+        default.update(f)
+        w = custom.update(f, with_recovery=True)[2]
+        assert w == default.get_recovery_window(theta_irrev=25.0, epsilon=0.5)
+        assert w == custom.get_recovery_window()
+        differ += w != default.get_recovery_window()
+    assert differ
+    restored = UTLDetector.from_bytes(custom.to_bytes())
+    assert (restored.theta_irrev, restored.epsilon) == (25.0, 0.5)
@@ -0,0 +1,189 @@
+import re
+
+import pytest
+
+from utl import features as F
+from utl.features import LexiconMatcher, extract_turn_features
+
+TEXTS = [
+    "",
+    "ok",
+    "I want to die tonight, nobody cares and I have no friends",
+    "How to get pills? I'm going to hurt myself. Goodbye, take care, thanks for everything",
+    "I feel hopeless and alone, no point, tried that, won't work",
+    "my friend and family, my kids, my job. grateful and hopeful about tomorrow",
+    "Where can I get help? Can you recommend a help line? I plan to walk and do breathing",
+]
+
+
+def _naive_counts(t):
+    return {
+        "suicidal": sum(1 for kw in F.SUICIDAL_KEYWORDS if kw in t),
+        "method": 1.0 if ("how to" in t and any(m in t for m in F.METHOD_NOUNS)) else 0.0,
+        "finality": sum(1 for p in F.FINALITY if p in t),
+        "isolation": sum(1 for p in F.ISOLATION if p in t),
+        "self_harm": 1.0 if re.search(
+            r"i('m| am)? (going to|will) (hurt|cut|kill) (myself|me)?", t) else 0.0,
+        "social": 1.0 if "friend" in t or "family" in t else 0.0,
+    }
+
+
+def test_matcher_counts_distinct_overlapping_phrases():
+    cats = {"a": ["no one", "one", "no one understands"], "b": ["one"], "c": []}
+    for m in (LexiconMatcher(cats), LexiconMatcher(cats, regex_min_phrases=0)):
+        assert m.count("no one understands, no one") == {"a": 3, "b": 1, "c": 0}
+        assert m.count("nothing") == {"a": 0, "b": 0, "c": 0}
+
+
+def test_regex_matcher_agrees_with_scan():
+    cats = {k: v for k, v in F._LEX.items()}
+    cats.update(F.INLINE_PHRASES)
+    scan, regex = LexiconMatcher(cats), LexiconMatcher(cats, regex_min_phrases=0)
+    for text in TEXTS:
+        assert scan.count(text.lower()) == regex.count(text.lower())
+    assert LexiconMatcher({}).count("anything") == {}
+    assert LexiconMatcher({"a": [], "b": [""]}, regex_min_phrases=0).count("x") == {"a": 0, "b": 0}
+
+
+def test_features_match_substring_scan():
+    for text in TEXTS:
+        f = extract_turn_features(text, turn_index=3, session_minutes=30)
+        ref = _naive_counts(text.lower())
+        assert f["ling_suicidal_keywords"] == min(1.0, ref["suicidal"] / 3.0)
+        assert f["ling_method_inquiries"] == ref["method"]
+        assert f["ling_finality"] == min(1.0, ref["finality"] / 3.0)
+        assert f["ling_isolation"] == min(1.0, ref["isolation"] / 3.0)
+        assert f["ling_self_harm_verbs"] == ref["self_harm"]
+        assert f["pro_social_support"] == ref["social"]
+        assert all(0.0 <= v <= 1.0 for v in f.values())
+
+
+def test_conversation_state_fills_behavioral_features():
+    from utl.features import ConversationFeatureState
+
+    st = ConversationFeatureState(latency_cap=60.0, hazard_window=3)
+    f1 = st.extract("i feel alone", timestamp=1000.0)
+    assert f1["beh_response_latency"] == 0.0 and f1["beh_topic_fixation"] == 0.0
+    st.observe_hazard(0.1)
+    st.observe_hazard(0.3)
+    f2 = st.extract("i feel so alone", timestamp=1030.0)
+    assert f2["beh_response_latency"] == 0.5
+    assert f2["beh_topic_fixation"] == 3 / 4
+    assert abs(f2["beh_escalation_rate"] - 0.2) < 1e-12
+    assert f2["beh_turn_count"] == 2 / 30.0
+    assert abs(f2["tmp_session_duration"] - 0.5 / 120.0) < 1e-12
+    # A turn without a timestamp keeps the session duration so far
+    assert st.extract("still here")["tmp_session_duration"] == f2["tmp_session_duration"]
+    st.reset()
+    assert st.extract("hi")["beh_escalation_rate"] == 0.0
+
+
+def test_lexicon_configuration_and_compiled_artifact(tmp_path, monkeypatch):
+    import json
+
+    from utl import lexicon
+
+    src = tmp_path / "lex.json"
+    src.write_text(json.dumps({"suicidal_keywords": ["zzyzx"]}), encoding="utf-8")
+    art = tmp_path / "lex.pkl"
+    assert lexicon.main(["compile", str(src), str(art)]) == 0
+    # A missing or malformed source must not silently compile DEFAULT_LEXICON
+    bad = tmp_path / "bad.json"
+    bad.write_text("{not json", encoding="utf-8")
+    for path in (bad, tmp_path / "missing.json"):
+        assert lexicon.main(["compile", str(path), str(tmp_path / "bad.pkl")]) == 1
+    assert not (tmp_path / "bad.pkl").exists()
+    try:
+        lexicon.configure(path=str(src))
+        assert extract_turn_features("ZZYZX", 1)["ling_suicidal_keywords"] == 1 / 3
+        assert F.SUICIDAL_KEYWORDS == {"zzyzx"}
+        lexicon.configure()
+        monkeypatch.setenv(lexicon.ENV_COMPILED, str(art))
+        assert lexicon.get_lexicon() == {"suicidal_keywords": ["zzyzx"]}
+        assert lexicon.get_matcher().count("zzyzx")["suicidal_keywords"] == 1
+    finally:
+        monkeypatch.delenv(lexicon.ENV_COMPILED)
+        lexicon.configure()
+    assert "suicide" in F.SUICIDAL_KEYWORDS
+
+
+def test_registry_hot_reload_swaps_atomically(tmp_path):
+    import json
+    import os
+
+    from utl.lexicon import LexiconRegistry
+
+    src = tmp_path / "lex.json"
+    src.write_text(json.dumps({"isolation_markers": ["alone"]}), encoding="utf-8")
+    reg = LexiconRegistry(path=str(src))
+    old = reg.current()
+    assert not reg.check()
+
+    src.write_text("{broken", encoding="utf-8")
+    os.utime(src, ns=(1, 1))
+    assert not reg.check() and reg.errors == 1 and reg.current() is old
+
+    src.write_text(json.dumps({"isolation_markers": ["alone", "lonely"]}), encoding="utf-8")
+    os.utime(src, ns=(2, 2))
+    assert reg.check()
+    new = reg.current()
+    assert new.version != old.version
+    assert old.matcher.count("lonely")["isolation_markers"] == 0  # in-flight snapshot unchanged
+    assert new.matcher.count("lonely")["isolation_markers"] == 1
+    reg.watch(interval=0.01)
+    reg.stop()
+
+
+def test_features_tagged_with_lexicon_version():
+    from utl.lexicon import current_lexicon
+
+    f = extract_turn_features("hello", 1)
+    assert f.lexicon_version == current_lexicon().version
+
+
+def test_feature_cache_reuses_text_features():
+    texts = ["ok", "OK", "I want to end my life, goodbye", "ok", "thanks " * 50]
+    ref = [dict(extract_turn_features(t, i + 1, 5.0 * i)) for i, t in enumerate(texts)]
+    cache = F.enable_feature_cache(maxsize=2, max_chars=100)
+    try:
+        got = [extract_turn_features(t, i + 1, 5.0 * i) for i, t in enumerate(texts)]
+        assert [dict(g) for g in got] == ref
+        # "OK" and the second "ok" hit; the long text is not cached
+        assert (cache.hits, cache.misses, cache.evictions) == (2, 2, 0)
+        got[0]["beh_response_latency"] = 1.0  # callers may mutate their dict
+        assert extract_turn_features("ok", 9)["beh_response_latency"] == 0.0
+        extract_turn_features("goodbye", 1)
+        assert cache.evictions == 1 and len(cache) == 2
+    finally:
+        F.disable_feature_cache()
+    assert F.feature_cache() is None
+
+
+def test_feature_cache_env_setting(monkeypatch):
+    monkeypatch.setenv(F.ENV_FEATURE_CACHE, "128")
+    assert F._cache_from_env().maxsize == 128
+    for value in ("on", "-5"):
+        monkeypatch.setenv(F.ENV_FEATURE_CACHE, value)
+        with pytest.warns(RuntimeWarning, match="UTL_FEATURE_CACHE"):
+            assert F._cache_from_env() is None
+    monkeypatch.setenv(F.ENV_FEATURE_CACHE, "0")
+    assert F._cache_from_env() is None
+
+
+def test_extract_features_batch_matches_per_turn():
+    import numpy as np
+
+    from utl.channels import features_to_matrix
+
+    texts = ["ok", None, "I want to end my life, goodbye", "my friend helps, grateful",
+             "I am going to hurt myself tomorrow", "nobody cares " * 40] * 3
+    turns = np.arange(1, len(texts) + 1) * 3
+    minutes = np.linspace(0, 300, len(texts))
+    ref = features_to_matrix([extract_turn_features(t, i, m)
+                              for t, i, m in zip(texts, turns, minutes, strict=True)])
+    X, names = F.extract_features_batch(texts, turns, minutes)
+    assert names == F.FEATURE_NAMES and X.dtype == np.float32 and X.flags.c_contiguous
+    assert np.array_equal(X, ref)
+    X2, _ = F.extract_features_batch(texts, turns, minutes, workers=2, chunksize=4)
+    assert np.array_equal(X2, ref)
+    assert F.extract_features_batch([])[0].shape == (0, len(F.FEATURE_NAMES))
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from experiments.crisis_chat_loader import (
+    DEFAULTS,
+    run_sharded,
+    run_streaming,
+    score_frame,
+    shard_bounds,
+)
+from utl.results import open_results
+
+
+def _frame(lengths, seed=0):
+    rng = np.random.default_rng(seed)
+    conv = np.repeat(np.arange(len(lengths)), lengths)
+    n = len(conv)
+    return pd.DataFrame({
+        "conversation_id": conv,
+        "turn": np.concatenate([np.arange(1, k + 1) for k in lengths]),
+        "linguistic_hazard": rng.random(n),
+        "behavioral_hazard": rng.random(n),
+        "temporal_hazard": rng.random(n),
+        "resilience_score": rng.random(n) * 0.3,
+        "crisis_label": (rng.random(n) < 0.2).astype(int),
+    })
+
+
+@pytest.mark.parametrize("lengths, workers", [
+    ([3, 2, 4, 200], 4),   # long trailing conversation
+    ([25], 3),             # single conversation
+    ([4, 1, 6], 8),        # more workers than conversations
+])
+@pytest.mark.parametrize("fmt", ["npy", "csv"])
+def test_sharded_matches_serial(tmp_path, lengths, workers, fmt):
+    df = _frame(lengths)
+    serial = score_frame(df, DEFAULTS)
+    bounds = shard_bounds(df["conversation_id"].values, workers)
+    assert bounds[0][0] == 0 and bounds[-1][1] == len(df)
+    assert len(bounds) <= min(workers, len(lengths))
+
+    out_path = tmp_path / ("loader_turns" if fmt == "npy" else "loader_turns.csv")
+    res = run_sharded(df, DEFAULTS, workers, out_path, fmt)
+    pd.testing.assert_frame_equal(res, serial)
+    written = open_results(out_path).to_frame() if fmt == "npy" else pd.read_csv(out_path)
+    pd.testing.assert_frame_equal(written, serial, check_dtype=False)
+
+
+def test_stream_matches_serial_and_checks_order(tmp_path):
+    df = _frame([3, 9, 2, 7])
+    path = tmp_path / "in.csv"
+    df.to_csv(path, index=False)
+    cols = list(DEFAULTS.values())
+    out_path = tmp_path / "stream.csv"
+    run_streaming(path, cols, DEFAULTS, 4, out_path, 0.68, fmt="csv")
+    pd.testing.assert_frame_equal(pd.read_csv(out_path), score_frame(df, DEFAULTS),
+                                  check_dtype=False)
+
+    # Turns out of order within a chunk, and across a chunk edge (rows 3 | 4)
+    for a, b in ((5, 6), (3, 4)):
+        bad = df.copy()
+        bad.loc[[a, b], "turn"] = bad.loc[[b, a], "turn"].values
+        bad.to_csv(path, index=False)
+        with pytest.raises(SystemExit, match="sorted"):
+            run_streaming(path, cols, DEFAULTS, 4, out_path, 0.68, fmt="csv")
@@ -0,0 +1,47 @@
+import numpy as np
+
+from utl import metrics
+
+
+def _naive(y, s, thr):
+    pred = s > thr
+    tp = int((pred & y).sum())
+    fp = int((pred & ~y).sum())
+    fn = int((~pred & y).sum())
+    tn = int((~pred & ~y).sum())
+    return metrics.metrics_from_counts(tp, fp, tn, fn)
+
+
+def test_sweep_matches_per_threshold_evaluation():
+    rng = np.random.default_rng(0)
+    y = rng.random(500) < 0.2
+    s = np.round(rng.random(500), 2)  # plenty of ties
+    grid = np.linspace(0.0, 1.0, 23)
+    sw = metrics.threshold_sweep(y, s, grid)
+    for i, thr in enumerate(grid):
+        ref = _naive(y, s, thr)
+        assert metrics.evaluate(y, s, thr) == ref
+        for k in ("tp", "fp", "tn", "fn", "precision", "recall", "f1", "accuracy"):
+            assert np.isclose(sw[k][i], ref[k])
+    assert len(metrics.threshold_sweep(y, s)["threshold"]) == len(np.unique(s))
+
+
+def test_auc_against_pairwise_definitions():
+    rng = np.random.default_rng(1)
+    y = rng.random(200) < 0.3
+    s = np.round(rng.random(200), 1)
+    pos, neg = s[y], s[~y]
+    pairs = (pos[:, None] > neg[None, :]).mean() + 0.5 * (pos[:, None] == neg[None, :]).mean()
+    assert np.isclose(metrics.roc_auc(y, s), pairs)
+
+    ap = 0.0
+    prev_rec = 0.0
+    for thr in np.unique(s)[::-1]:
+        pred = s >= thr
+        rec = (pred & y).sum() / y.sum()
+        ap += (rec - prev_rec) * (pred & y).sum() / pred.sum()
+        prev_rec = rec
+    assert np.isclose(metrics.pr_auc(y, s), ap)
+    assert np.isnan(metrics.roc_auc([0, 0], [0.1, 0.2]))
+    m = metrics.summarize(y, s)
+    assert {"precision", "pr_auc", "roc_auc"} <= set(m)
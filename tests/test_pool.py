@@ -0,0 +1,36 @@
+import pytest
+
+from utl.pool import DetectorPool
+
+
+def test_pool_lru_and_ttl_eviction():
+    now = [0.0]
+    pool = DetectorPool(max_sessions=2, ttl=10.0, clock=lambda: now[0])
+    a = pool.get("a")
+    pool.get("b")
+    assert pool.get("a") is a
+    pool.get("c")  # evicts b (least recently used)
+    assert "b" not in pool and "a" in pool and len(pool) == 2
+    now[0] = 20.0
+    assert pool.get("a") is not a  # expired
+    assert "c" not in pool and pool.evictions == 3
+
+
+def test_score_endpoint():
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    from api.compare import app
+
+    client = TestClient(app)
+    r = client.post("/score", json={"conversation_id": "x", "text": "I feel alone tonight"})
+    assert r.status_code == 200 and r.json()["turn"] == 1
+    r = client.post("/api/score/batch", json={"turns": [
+        {"conversation_id": "x", "text": "nobody cares", "timestamp": 5.0},
+        {"conversation_id": "y", "channels": {"linguistic": 0.9, "behavioral": 0.9}},
+    ]})
+    out = r.json()["results"]
+    assert [o["turn"] for o in out] == [2, 1]
+    assert all(0.0 <= o["hazard"] <= 1.0 for o in out)
+    assert client.get("/api/compare").json()["ok"] is True
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from utl.results import ResultsWriter, is_store, open_results, write_results
+
+
+def _table(n_conv=20, seed=0):
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(1, 12, size=n_conv)
+    conv = np.repeat(np.arange(n_conv) * 3, lengths)
+    turn = np.concatenate([np.arange(1, k + 1) for k in lengths])
+    return {"conversation_id": conv, "turn": turn, "hazard": rng.random(len(conv)),
+            "crisis_label": (rng.random(len(conv)) < 0.2).astype(np.int8)}
+
+
+def test_round_trip_is_memmapped(tmp_path):
+    t = _table()
+    write_results(tmp_path / "store", t)
+    assert is_store(tmp_path / "store")
+    res = open_results(tmp_path / "store")
+    assert len(res) == len(t["hazard"])
+    assert isinstance(res["hazard"], np.memmap)
+    for name, col in t.items():
+        assert res[name].dtype == col.dtype
+        np.testing.assert_array_equal(res[name], col)
+    # Plain np.load still reads the column files
+    np.testing.assert_array_equal(np.load(tmp_path / "store" / "turn.npy"), t["turn"])
+    assert list(res.to_frame().columns) == list(t)
+
+
+def test_appended_chunks_match_single_write(tmp_path):
+    t = _table(50, seed=1)
+    write_results(tmp_path / "one", t)
+    # Chunk edges fall inside conversations
+    with ResultsWriter(tmp_path / "many") as w:
+        for a in range(0, len(t["hazard"]), 7):
+            w.append({k: v[a:a + 7] for k, v in t.items()})
+    one, many = open_results(tmp_path / "one"), open_results(tmp_path / "many")
+    np.testing.assert_array_equal(one.conversations, many.conversations)
+    np.testing.assert_array_equal(one.offsets, many.offsets)
+    for name in t:
+        np.testing.assert_array_equal(one[name], many[name])
+
+
+def test_conversation_lookup(tmp_path):
+    t = _table()
+    write_results(tmp_path / "store", t)
+    res = open_results(tmp_path / "store")
+    assert len(res.conversations) == 20
+    for conv_id in (0, 27, 57):
+        rows = res.conversation(conv_id)
+        mask = t["conversation_id"] == conv_id
+        np.testing.assert_array_equal(rows["hazard"], t["hazard"][mask])
+        np.testing.assert_array_equal(rows["turn"], np.arange(1, mask.sum() + 1))
+    with pytest.raises(KeyError):
+        res.conversation(1)
+    seen = [c for c, _ in res.iter_conversations()]
+    assert seen == sorted(set(t["conversation_id"].tolist()))
+
+
+def test_unsorted_ids_and_grouping(tmp_path):
+    conv = np.array([5, 5, 2, 9, 9, 9])
+    write_results(tmp_path / "store", {"conversation_id": conv, "hazard": np.arange(6.0)})
+    res = open_results(tmp_path / "store")
+    np.testing.assert_array_equal(res.conversation(9)["hazard"], [3.0, 4.0, 5.0])
+    np.testing.assert_array_equal(res.conversation(2)["hazard"], [2.0])
+    with pytest.raises(ValueError, match="grouped"):
+        write_results(tmp_path / "bad", {"conversation_id": np.array([1, 2, 1]),
+                                         "hazard": np.zeros(3)})
+    with pytest.raises(TypeError):
+        write_results(tmp_path / "str", {"conversation_id": conv, "note": np.array(["a"] * 6)})
+
+
+def test_string_ids_are_coded(tmp_path):
+    conv = np.array(["c1", "c1", "c0", "c0", "c0", "x"], dtype=object)
+    t = {"conversation_id": conv, "hazard": np.arange(6.0)}
+    with ResultsWriter(tmp_path / "store") as w:
+        w.append({k: v[:3] for k, v in t.items()})
+        w.append({k: v[3:] for k, v in t.items()})
+    res = open_results(tmp_path / "store")
+    np.testing.assert_array_equal(res["conversation_id"], [0, 0, 1, 1, 1, 2])
+    assert res.conversations.tolist() == ["c1", "c0", "x"]
+    np.testing.assert_array_equal(res.conversation("c0")["hazard"], [2.0, 3.0, 4.0])
+    assert res.to_frame()["conversation_id"].tolist() == conv.tolist()
+    with pytest.raises(ValueError, match="grouped"):
+        write_results(tmp_path / "bad", {"conversation_id": np.array(["a", "b", "a"]),
+                                         "hazard": np.zeros(3)})
+
+
+def test_object_int_ids_stay_ints(tmp_path):
+    conv = np.array([7, 7, 3, 10, 10], dtype=object)
+    t = {"conversation_id": conv, "hazard": np.arange(5.0)}
+    with ResultsWriter(tmp_path / "store") as w:
+        w.append({k: v[:3] for k, v in t.items()})
+        w.append({k: v[3:] for k, v in t.items()})
+    res = open_results(tmp_path / "store")
+    assert not res.conv_codes and res["conversation_id"].dtype == np.int64
+    np.testing.assert_array_equal(res["conversation_id"], [7, 7, 3, 10, 10])
+    np.testing.assert_array_equal(res.conversation(10)["hazard"], [3.0, 4.0])
+    frame = res.to_frame()
+    assert frame["conversation_id"].tolist() == conv.tolist()
+    assert frame["conversation_id"].dtype == np.int64
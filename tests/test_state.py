@@ -0,0 +1,36 @@
+import pytest
+
+from utl.detector import UTLDetector
+from utl.state import InMemoryStateStore, SQLiteStateStore
+
+FEATS = [{"linguistic": 0.1 * i, "behavioral": 0.5, "temporal": 0.2, "resilience": 0.05}
+         for i in range(1, 10)]
+
+
+def test_snapshot_round_trip_resumes_identically():
+    ref = UTLDetector(window=4, history_cap=6)
+    for f in FEATS[:7]:
+        ref.update(f)
+    restored = UTLDetector.from_bytes(ref.to_bytes())
+    assert restored.history == ref.history
+    assert restored.turn == ref.turn and restored.window == 4
+    for f in FEATS[7:]:
+        assert restored.update(f) == ref.update(f)
+    assert restored.history == ref.history
+
+    light = UTLDetector.from_bytes(ref.to_bytes(include_history=False))
+    assert len(light.history) == 0 and light.theta_t == ref.theta_t
+
+    with pytest.raises(ValueError):
+        UTLDetector.from_bytes(b"nope")
+
+
+@pytest.mark.parametrize("store", [InMemoryStateStore(), SQLiteStateStore(":memory:")])
+def test_state_stores(store):
+    det = store.load("c1")
+    det.update(FEATS[0])
+    store.save("c1", det)
+    again = store.load("c1")
+    assert again.turn == 1 and again.history == det.history
+    store.delete("c1")
+    assert store.load("c1").turn == 0
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from utl.channels import ChannelAggregator
+from utl.detector import UTLDetector
+from utl.features import ConversationFeatureState
+from utl.stream import StreamScorer
+
+TEXTS = ["hi there", "I feel alone tonight", "nobody cares, I want to end it all",
+         "I have the pills", "maybe tomorrow", "no point anymore"]
+
+
+def _events():
+    return [(f"c{i % 3}", TEXTS[(i * 5 + i // 3) % len(TEXTS)], 10.0 * i) for i in range(30)]
+
+
+async def _source(events, delay=0.0):
+    for ev in events:
+        yield ev
+        await asyncio.sleep(delay)
+
+
+def _reference(events):
+    agg = ChannelAggregator()
+    dets, states, out = {}, {}, {}
+    for cid, text, ts in events:
+        det = dets.setdefault(cid, UTLDetector())
+        st = states.setdefault(cid, ConversationFeatureState())
+        h, c = det.update(agg.channels(st.extract(text, ts)))
+        st.observe_hazard(h)
+        out.setdefault(cid, []).append((det.turn, h, c))
+    return out
+
+
+@pytest.mark.parametrize("delay,window", [(0.0, 0.01), (0.001, 0.0)])
+def test_stream_matches_sequential_scoring(delay, window):
+    events = _events()
+    alerts = []
+
+    async def sink(event):
+        alerts.append(event)
+
+    async def run():
+        scorer = StreamScorer(sink=sink, batch_window=window, max_batch=8, max_pending=4)
+        return [e async for e in scorer.score(_source(events, delay))], scorer
+
+    got, scorer = asyncio.run(run())
+    assert [(e.conversation_id, e.timestamp) for e in got] == [(c, ts) for c, _, ts in events]
+    ref = _reference(events)
+    for cid, rows in ref.items():
+        mine = [e for e in got if e.conversation_id == cid]
+        assert [e.turn for e in mine] == [r[0] for r in rows]
+        assert [e.hazard for e in mine] == [r[1] for r in rows]
+    assert alerts == [e for e in got if e.crisis] and scorer.alerts == len(alerts)
+
+
+def test_stream_source_error_after_pending_events():
+    async def bad():
+        yield ("a", "hello", 0.0)
+        raise RuntimeError("gateway closed")
+
+    async def run():
+        seen = []
+        with pytest.raises(RuntimeError, match="gateway closed"):
+            async for e in StreamScorer().score(bad()):
+                seen.append(e)
+        return seen
+
+    assert len(asyncio.run(run())) == 1
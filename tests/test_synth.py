@@ -0,0 +1,39 @@
+import pandas as pd
+import pytest
+
+from utl.synth import COLUMNS, generate, generate_chunk, parse_length
+
+
+def test_generate_is_deterministic_across_workers(tmp_path):
+    a, b = tmp_path / "a.csv", tmp_path / "b.csv"
+    n = generate(str(a), 250, chunk=60, seed=3)
+    assert generate(str(b), 250, chunk=60, workers=2, seed=3) == n
+    assert a.read_bytes() == b.read_bytes()
+    df = pd.read_csv(a)
+    assert list(df.columns) == COLUMNS and len(df) == n
+    assert df["conversation_id"].nunique() == 250
+    turns = df.groupby("conversation_id")["turn"]
+    assert turns.apply(lambda t: list(t) == list(range(1, len(t) + 1))).all()
+    for c in COLUMNS[2:6]:
+        assert df[c].between(0.0, 1.0).all()
+
+
+def test_chunk_shape_and_labels():
+    df = generate_chunk(0, 2000, seed=1, length=parse_length("fixed:20"), prevalence=0.25,
+                        profiles={"sudden": 1.0})
+    assert len(df) == 40000
+    crisis = df.groupby("conversation_id")["crisis_label"].max()
+    assert 0.2 < crisis.mean() < 0.3
+    # Labels are a suffix of each crisis conversation
+    labels = df.groupby("conversation_id")["crisis_label"]
+    assert labels.apply(lambda s: s.is_monotonic_increasing).all()
+    ling = df.groupby("crisis_label")["linguistic_hazard"].mean()
+    assert ling[1] > ling[0]
+
+
+def test_text_column():
+    df = generate_chunk(0, 50, seed=0, text=True, prevalence=1.0)
+    assert df["text"].str.len().gt(0).all()
+    assert (df.groupby("conversation_id")["timestamp"].diff().dropna() >= 0).all()
+    with pytest.raises(ValueError):
+        parse_length("poisson:3")
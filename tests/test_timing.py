@@ -0,0 +1,59 @@
+import pytest
+
+from utl.timing import BUCKETS, Histogram, StageTimer
+
+
+def test_disabled_timer_records_nothing():
+    timer = StageTimer(enabled=False)
+    with timer.stage("features"):
+        pass
+    assert timer.histograms() == {}
+    assert timer.stage("a") is timer.stage("b")  # shared no-op span
+
+
+def test_histogram_buckets_and_prometheus_text():
+    timer = StageTimer(enabled=True)
+    seen = []
+    timer.add_hook(lambda name, s: seen.append(name))
+    for s in (2e-6, 2e-6, 3e-3, 20.0):
+        timer.observe("detector", s)
+    with timer.stage("features"):
+        pass
+    h = timer.histograms()["detector"]
+    assert h.count == 4 and h.total == pytest.approx(20.003004)
+    assert h.counts[BUCKETS.index(2.5e-6)] == 2 and h.counts[-1] == 1
+    assert 1e-6 <= h.quantile(0.5) <= 2.5e-6
+    assert seen == ["detector"] * 4 + ["features"]
+
+    text = timer.render_prometheus()
+    assert "# TYPE utl_stage_seconds histogram" in text
+    assert 'utl_stage_seconds_bucket{stage="detector",le="2.5e-06"} 2' in text
+    assert 'utl_stage_seconds_bucket{stage="detector",le="+Inf"} 4' in text
+    assert 'utl_stage_seconds_count{stage="features"} 1' in text
+    assert "detector" in timer.summary()
+    assert Histogram().quantile(0.5) != Histogram().quantile(0.5)  # nan when empty
+
+
+def test_metrics_endpoint():
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    from api.compare import app
+    from utl import features
+    from utl.timing import TIMER
+
+    client = TestClient(app)
+    TIMER.enable()
+    features.enable_feature_cache()
+    try:
+        client.post("/score", json={"conversation_id": "m", "text": "I feel alone"})
+        r = client.get("/api/metrics")
+    finally:
+        TIMER.disable()
+        TIMER.reset()
+        features.disable_feature_cache()
+    assert r.status_code == 200 and r.headers["content-type"].startswith("text/plain")
+    assert "utl_feature_cache_misses_total 1" in r.text
+    for stage in ("features", "channels", "detector"):
+        assert f'utl_stage_seconds_count{{stage="{stage}"}} 1' in r.text
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utl.batch import UTLBatchDetector
+from utl.metrics import evaluate
+from utl.tune import main, param_grid, random_params, tune
+
+
+def test_tune_matches_direct_replay():
+    rng = np.random.default_rng(0)
+    lengths = rng.integers(3, 15, size=12)
+    conv = np.repeat(np.arange(12), lengths)
+    turns = np.concatenate([np.arange(1, n + 1) for n in lengths])
+    X = rng.random((len(conv), 4)) * [1, 1, 1, 0.3]
+    y = (X[:, 0] > 0.7).astype(int)
+
+    params = param_grid([0.1, 0.3], [1.0, 1.5], [0.8], [0.4, 0.6])
+    table = tune(conv, turns, X, y, params, chunk=3)
+    assert len(table) == len(params)
+    assert table["conv_f1"].is_monotonic_decreasing
+
+    for _, row in table.iterrows():
+        det = UTLBatchDetector(alpha=row.alpha, theta_mult=row.theta_mult, beta=row.beta)
+        h, _ = det.run(conv, turns, *X.T)
+        m = evaluate(y, h, thr=row.tau)
+        assert np.isclose(row.turn_f1, m["f1"]) and np.isclose(row.turn_recall, m["recall"])
+        g = pd.DataFrame({"c": conv, "h": h, "y": y}).groupby("c").max()
+        assert np.isclose(row.conv_f1, evaluate(g.y.values, g.h.values, thr=row.tau)["f1"])
+
+    sample = random_params(5, {"alpha": (0.1, 0.2), "theta_mult": (1, 2),
+                               "beta": (0.5, 0.9), "tau": (0.4, 0.7)}, seed=1)
+    assert len(tune(conv, turns, X, y, sample)) == 5
+
+
+def test_tune_rejects_empty_grid():
+    conv, turns, X, y = np.zeros(3, int), np.arange(1, 4), np.zeros((3, 4)), np.zeros(3, int)
+    with pytest.raises(ValueError, match="empty"):
+        tune(conv, turns, X, y, param_grid([0.1], [1.0], [0.8], []))
+    with pytest.raises(SystemExit):
+        main(["--tau", ""])
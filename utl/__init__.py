@@ -1 +1,17 @@
-from .detector import UTLDetector
+# Public classes are imported lazily so that `import utl.features` (or the
+# lexicon) does not pull in NumPy on serverless cold starts.
+_EXPORTS = {
+    "UTLDetector": ".detector",
+    "UTLBatchDetector": ".batch",
+    "ChannelAggregator": ".channels",
+    "StreamScorer": ".stream",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        from importlib import import_module
+        return getattr(import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,194 @@
+"""
+UTL Framework: Vectorized batch detector
+Runs the UTLDetector recurrence for many conversations at once.
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class UTLBatchDetector:
+    """
+    Vectorized counterpart of UTLDetector for offline re-scoring.
+
+    All per-conversation state (EWMA accumulator, hazard variance statistics,
+    cumulative risk) is held in NumPy arrays and advanced one turn index at a
+    time across every conversation, so the Python loop runs max(turns) times
+    instead of once per row.
+
+    Parameters are the same as UTLDetector. `alpha`, `theta_mult`, `beta` and
+    `tau` may also be 1-D arrays of length K to score K parameter settings at
+    once (e.g. a hyperparameter grid); results then have shape (N, K).
+
+    Single-setting runs use the compiled per-conversation kernel in
+    utl.kernels when numba is installed (`jit=None`); `jit=False` forces the
+    NumPy path.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.15,
+        theta_mult: float = 1.5,
+        gamma: float = 1.5,
+        beta: float = 0.8,
+        tau: float = 0.68,
+        window: Optional[int] = None,
+        jit: Optional[bool] = None
+    ):
+        if window is not None and window < 1:
+            raise ValueError("window must be a positive integer or None")
+        self.alpha = alpha
+        self.theta_mult = theta_mult
+        self.gamma = gamma
+        self.beta = beta
+        self.tau = tau
+        self.window = window
+        self.jit = jit
+
+        # Final per-conversation state from the last run()
+        self.conversations = np.empty(0)
+        self.theta_t = np.empty(0)
+
+    def run(self, conv_ids, turns, ling, beh, tmp, res) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score every row of a turn-level dataset.
+
+        Args:
+            conv_ids: Conversation identifier per row (any sortable dtype)
+            turns: Turn number per row; orders rows within a conversation
+            ling, beh, tmp, res: Channel values per row, shape (N,) or (N, K)
+                for K independent variants of the same rows (e.g. ablation masks)
+
+        Returns:
+            (hazards, crisis): float64 and bool arrays aligned to the input rows,
+            shape (N,) or (N, K)
+        """
+        conv_ids = np.asarray(conv_ids)
+        turns = np.asarray(turns)
+        n_rows = len(conv_ids)
+        chans = [np.asarray(c, dtype=np.float64) for c in (ling, beh, tmp, res)]
+        params = [np.asarray(p) for p in (self.alpha, self.theta_mult, self.beta, self.tau)]
+        squeeze = all(c.ndim == 1 for c in chans) and all(p.ndim == 0 for p in params)
+        chans = [c[:, None] if c.ndim == 1 else c for c in chans]
+        n_var = np.broadcast_shapes(*[c.shape[1:] for c in chans],
+                                    *[p.reshape(-1).shape for p in params])[0]
+        chans = [np.broadcast_to(c, (n_rows, n_var)) for c in chans]
+        shape = (n_rows,) if squeeze else (n_rows, n_var)
+        if n_rows == 0:
+            return np.zeros(shape), np.zeros(shape, dtype=bool)
+
+        # Order rows by (conversation, turn); keep ties in input order
+        order = np.lexsort((np.arange(n_rows), turns, conv_ids))
+        conv_sorted = conv_ids[order]
+        new_conv = np.ones(n_rows, dtype=bool)
+        new_conv[1:] = conv_sorted[1:] != conv_sorted[:-1]
+        starts = np.flatnonzero(new_conv)
+        lengths = np.diff(np.append(starts, n_rows))
+
+        if squeeze and self.jit is not False:
+            from .kernels import HAVE_NUMBA, hazard_scan
+            if HAVE_NUMBA or self.jit:
+                X = np.column_stack([c[order, 0] for c in chans])
+                h_sorted, theta_t = hazard_scan(np.append(starts, n_rows), X, self.alpha,
+                                                self.theta_mult, self.beta, self.window, jit=True)
+                hazards = np.empty(n_rows)
+                hazards[order] = h_sorted
+                self.conversations = conv_sorted[starts]
+                self.theta_t = theta_t
+                return hazards, hazards > self.tau
+
+        r_all = (chans[0][order] + chans[1][order] + chans[2][order]) / 3.0
+        res_all = chans[3][order]
+
+        # Per-conversation state; variance counts are shared by all variants
+        n_conv = len(starts)
+        v_t = np.zeros((n_conv, n_var))
+        count = np.zeros((n_conv, 1))
+        mean = np.zeros((n_conv, n_var))
+        m2 = np.zeros((n_conv, n_var))
+        theta_t = np.zeros((n_conv, n_var))
+        buf = np.zeros((n_conv, n_var, self.window)) if self.window is not None else None
+        h_sorted = np.zeros((n_rows, n_var))
+
+        # Conversations sorted by length (descending) so the active set is a prefix
+        by_len = np.argsort(-lengths, kind="stable")
+        sorted_lengths = lengths[by_len]
+        for t in range(int(sorted_lengths[0])):
+            k = int(np.searchsorted(-sorted_lengths, -t, side="left"))
+            active = by_len[:k]
+            rows = starts[active] + t
+            r_t = r_all[rows]
+
+            v = self.alpha * (r_t ** 2) + (1 - self.alpha) * v_t[active]
+            v_t[active] = v
+
+            n = count[active]
+            has_hist = n > 0
+            var = np.where(has_hist, np.maximum(m2[active], 0.0) / np.maximum(n, 1.0), 0.0)
+            theta_adapt = np.where(has_hist, self.theta_mult * (var + 1e-6), 1.0)
+            s = np.where(theta_adapt > 0, 0.5 * theta_adapt, 0.5)
+            z = (v - theta_adapt) / np.maximum(s, 1e-6)
+            # exp overflow means a hazard of 0, as in UTLDetector.update
+            h_t = np.where(z > -700.0, 1.0 / (1.0 + np.exp(-np.maximum(z, -700.0))), 0.0)
+            h_net = np.clip(h_t - self.beta * res_all[rows], 0.0, 1.0)
+            h_sorted[rows] = h_net
+            theta_t[active] += h_net
+
+            # Fold the new hazard into the running variance statistics
+            mu = mean[active]
+            acc = m2[active]
+            if buf is not None:
+                slot = t % self.window
+                full = n == self.window
+                old = buf[active, :, slot]
+                buf[active, :, slot] = h_net
+                slide_mu = mu + (h_net - old) / np.maximum(n, 1.0)
+                slide_m2 = acc + (h_net - old) * (h_net - slide_mu + old - mu)
+            n_new = n + 1 if buf is None else np.where(full, n, n + 1)
+            delta = h_net - mu
+            grow_mu = mu + delta / n_new
+            grow_m2 = acc + delta * (h_net - grow_mu)
+            if buf is not None:
+                mean[active] = np.where(full, slide_mu, grow_mu)
+                m2[active] = np.where(full, slide_m2, grow_m2)
+            else:
+                mean[active] = grow_mu
+                m2[active] = grow_m2
+            count[active] = n_new
+
+        hazards = np.empty((n_rows, n_var))
+        hazards[order] = h_sorted
+        crisis = hazards > self.tau
+        self.conversations = conv_sorted[starts]
+        self.theta_t = theta_t[:, 0] if squeeze else theta_t
+        if squeeze:
+            return hazards[:, 0], crisis[:, 0]
+        return hazards, crisis
+
+
+def run_variants(conv_ids, turns, channels, weights, chunk: int = 64, **detector_kw) -> np.ndarray:
+    """
+    Score K channel weightings of the same dataset in a single vectorized pass.
+
+    Args:
+        conv_ids, turns: As for UTLBatchDetector.run
+        channels: (N, 4) array of linguistic, behavioral, temporal, resilience
+        weights: (K, 4) per-variant channel multipliers; 0/1 rows are ablation
+            masks, other values reweight channels
+        chunk: Variants scored per pass (bounds memory at N x chunk floats)
+        **detector_kw: UTLBatchDetector parameters
+
+    Returns:
+        (N, K) hazards aligned to the input rows
+    """
+    X = np.asarray(channels, dtype=np.float64)
+    W = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+    if X.ndim != 2 or X.shape[1] != 4 or W.shape[1] != 4:
+        raise ValueError("channels must be (N, 4) and weights (K, 4)")
+    det = UTLBatchDetector(**detector_kw)
+    out = np.empty((len(X), len(W)))
+    for a in range(0, len(W), chunk):
+        Wc = W[a:a + chunk]
+        cols = [X[:, [c]] * Wc[:, c] for c in range(4)]
+        out[:, a:a + len(Wc)], _ = det.run(conv_ids, turns, *cols)
+    return out
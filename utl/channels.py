@@ -0,0 +1,94 @@
+"""
+Aggregation of extracted turn features into the four detector channels.
+
+`extract_turn_features` yields named features grouped by prefix (ling_, beh_,
+tmp_, pro_); `UTLDetector.update` consumes 'linguistic', 'behavioral',
+'temporal' and 'resilience'. The mapping is a fixed (n_features x 4) weight
+matrix over FEATURE_NAMES, so a batch of N turns is one float32 matmul.
+
+NumPy is imported only by the matrix paths; aggregating a single feature dict
+with the default weights (the online scoring path) does not load it.
+"""
+from array import array
+from typing import TYPE_CHECKING, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .features import FEATURE_NAMES
+
+if TYPE_CHECKING:
+    import numpy as np
+
+CHANNELS = ("linguistic", "behavioral", "temporal", "resilience")
+
+_GROUP_CHANNEL = {"ling": "linguistic", "beh": "behavioral", "tmp": "temporal", "pro": "resilience"}
+
+
+def _default_terms() -> Dict[str, List[Tuple[str, float]]]:
+    """Sparse form of `default_weights()` without NumPy (same float32 values)."""
+    groups: Dict[str, List[str]] = {ch: [] for ch in CHANNELS}
+    for name in FEATURE_NAMES:
+        groups[_GROUP_CHANNEL[name.split("_", 1)[0]]].append(name)
+    return {ch: [(name, array("f", [1.0 / len(names)])[0]) for name in names]
+            for ch, names in groups.items()}
+
+
+def default_weights() -> "np.ndarray":
+    """Equal-weight mean of each feature group into its channel, shape (n_features, 4)."""
+    import numpy as np
+    W = np.zeros((len(FEATURE_NAMES), len(CHANNELS)), dtype=np.float32)
+    for i, name in enumerate(FEATURE_NAMES):
+        W[i, CHANNELS.index(_GROUP_CHANNEL[name.split("_", 1)[0]])] = 1.0
+    W /= W.sum(axis=0, keepdims=True)
+    return W
+
+
+def features_to_matrix(rows: Iterable[Mapping[str, float]]) -> "np.ndarray":
+    """Stack feature dicts into an (N, n_features) float32 array in FEATURE_NAMES order."""
+    import numpy as np
+    rows = list(rows)
+    X = np.zeros((len(rows), len(FEATURE_NAMES)), dtype=np.float32)
+    for i, feats in enumerate(rows):
+        X[i] = [feats.get(name, 0.0) for name in FEATURE_NAMES]
+    return X
+
+
+class ChannelAggregator:
+    """
+    Weighted aggregation layer from turn features to detector channels.
+
+    Parameters:
+        weights (array-like, optional): (n_features, 4) matrix over FEATURE_NAMES
+            and CHANNELS; defaults to the per-group mean from `default_weights()`
+    """
+
+    def __init__(self, weights: Optional[Sequence[Sequence[float]]] = None):
+        self._weights = None
+        if weights is None:
+            # Sparse view for single-turn dicts: channel -> [(feature, weight), ...]
+            self._terms = _default_terms()
+            return
+        import numpy as np
+        W = np.asarray(weights, dtype=np.float32)
+        if W.shape != (len(FEATURE_NAMES), len(CHANNELS)):
+            raise ValueError(f"weights must have shape {(len(FEATURE_NAMES), len(CHANNELS))}")
+        self._weights = np.ascontiguousarray(W)
+        self._terms = {
+            ch: [(FEATURE_NAMES[i], float(W[i, j])) for i in np.flatnonzero(W[:, j])]
+            for j, ch in enumerate(CHANNELS)
+        }
+
+    @property
+    def weights(self) -> "np.ndarray":
+        """(n_features, 4) float32 weight matrix (built on first use for the defaults)."""
+        if self._weights is None:
+            self._weights = default_weights()
+        return self._weights
+
+    def channels(self, feats: Mapping[str, float]) -> Dict[str, float]:
+        """Aggregate one feature dict into the dict `UTLDetector.update` expects."""
+        return {ch: sum(w * feats.get(name, 0.0) for name, w in terms)
+                for ch, terms in self._terms.items()}
+
+    def transform(self, X: "np.ndarray") -> "np.ndarray":
+        """Map an (N, n_features) feature matrix to an (N, 4) channel matrix."""
+        import numpy as np
+        return np.asarray(X, dtype=np.float32) @ self.weights
@@ -2,8 +2,120 @@
 UTL Framework: Core Detector Class
 Implements Algorithm 1 (minimal viable demo)
 """
-import numpy as np
-from typing import Dict, Tuple, List
+import math
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from typing import Dict, Iterator, List, Literal, Optional, Tuple, Union, overload
+
+
+class HazardHistory(Sequence):
+    """
+    Compact per-turn history of (turn, hazard, crisis) entries.
+
+    Behaves like the list of tuples the detector used to keep (indexing,
+    slicing, iteration, len), but stores hazards in an array('d') and crisis
+    flags in an array('b'); turn numbers are implicit since they are
+    consecutive. With `cap` set, only the most recent `cap` entries are kept
+    in a ring buffer. The arrays are allocated on the first append, so an
+    idle session holds no buffers.
+    """
+
+    __slots__ = ("cap", "_hazards", "_flags", "_head", "_last_turn")
+
+    def __init__(self, cap: Optional[int] = None):
+        if cap is not None and cap < 1:
+            raise ValueError("cap must be a positive integer or None")
+        self.cap = cap
+        self._hazards: Optional[array] = None
+        self._flags: Optional[array] = None
+        self._head = 0  # index of the oldest entry once the ring is full
+        self._last_turn = 0
+
+    def append(self, entry: Tuple[int, float, bool]) -> None:
+        turn, hazard, crisis = entry
+        self._last_turn = turn
+        if self._hazards is None:
+            self._hazards = array("d")
+            self._flags = array("b")
+        if self.cap is not None and len(self._hazards) == self.cap:
+            self._hazards[self._head] = hazard
+            self._flags[self._head] = crisis
+            self._head = (self._head + 1) % self.cap
+        else:
+            self._hazards.append(hazard)
+            self._flags.append(crisis)
+
+    def clear(self) -> None:
+        self._hazards = None
+        self._flags = None
+        self._head = 0
+        self._last_turn = 0
+
+    def hazards(self) -> List[float]:
+        """Hazards in chronological order."""
+        h = self._hazards
+        if h is None:
+            return []
+        return list(h[self._head:]) + list(h[:self._head]) if self._head else list(h)
+
+    def __len__(self) -> int:
+        return len(self._hazards) if self._hazards is not None else 0
+
+    def _entry(self, i: int) -> Tuple[int, float, bool]:
+        n = len(self._hazards)
+        j = (self._head + i) % n
+        return (self._last_turn - n + 1 + i, self._hazards[j], bool(self._flags[j]))
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self._entry(i) for i in range(*index.indices(len(self)))]
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("history index out of range")
+        return self._entry(index)
+
+    def __iter__(self) -> Iterator[Tuple[int, float, bool]]:
+        for i in range(len(self)):
+            yield self._entry(i)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (HazardHistory, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"HazardHistory({list(self)!r})"
+
+
+# Snapshot header: magic, version, flags, alpha, theta_mult, gamma, beta, tau,
+# window, history_cap (-1 = None), turn, v_t, theta_t, n, mean, m2,
+# recovery_len, recovery slope method, recovery sum, recovery index-weighted sum,
+# theta_irrev, epsilon, len(history)
+_SNAPSHOT = struct.Struct("<4sHH5dqqq2dq2dqB2d2dI")
+_SNAPSHOT_MAGIC = b"UTLD"
+_SNAPSHOT_VERSION = 3
+_SLOPES = ("endpoint", "lstsq")
+_HAS_HISTORY = 0x1
+
+
+def _to_le(a: array) -> bytes:
+    if sys.byteorder != "little":
+        a = array(a.typecode, a)
+        a.byteswap()
+    return a.tobytes()
+
+
+def _from_le(typecode: str, data: bytes) -> array:
+    a = array(typecode)
+    a.frombytes(data)
+    if sys.byteorder != "little":
+        a.byteswap()
+    return a
+
 
 class UTLDetector:
     """
@@ -15,38 +127,139 @@ class UTLDetector:
         gamma (float): Coupling coefficient (default: 1.5)
         beta (float): Resilience weight (default: 0.8)
         tau (float): Crisis threshold (default: 0.68)
+        window (int, optional): If set, the adaptive threshold uses the variance of
+            only the last `window` hazards (constant cost per turn). Default None
+            uses the full history, matching np.var over all past hazards.
+        history_cap (int, optional): Keep only the most recent `history_cap`
+            (turn, hazard, crisis) entries (default None keeps all)
+        recovery_len (int): Recent hazards used for the recovery-window slope (default: 5)
+        recovery_slope (str): 'endpoint' (newest minus oldest, over recovery_len;
+            the original heuristic) or 'lstsq' (least-squares slope)
+        theta_irrev (float): Cumulative risk treated as irreversible by the
+            recovery window (default: 10.0)
+        epsilon (float): Recovery tolerance of the recovery window (default: 0.1)
     """
 
+    __slots__ = ("alpha", "theta_mult", "gamma", "beta", "tau", "window",
+                 "recovery_len", "recovery_slope", "theta_irrev", "epsilon",
+                 "v_t", "theta_t", "turn", "history",
+                 "_n", "_mean", "_m2", "_window_vals",
+                 "_rec_vals", "_rec_sum", "_rec_isum")
+
     def __init__(
         self,
         alpha: float = 0.15,
         theta_mult: float = 1.5,
         gamma: float = 1.5,
         beta: float = 0.8,
-        tau: float = 0.68
+        tau: float = 0.68,
+        window: Optional[int] = None,
+        history_cap: Optional[int] = None,
+        recovery_len: int = 5,
+        recovery_slope: str = "endpoint",
+        theta_irrev: float = 10.0,
+        epsilon: float = 0.1
     ):
+        if window is not None and window < 1:
+            raise ValueError("window must be a positive integer or None")
+        if recovery_len < 2:
+            raise ValueError("recovery_len must be at least 2")
+        if recovery_slope not in _SLOPES:
+            raise ValueError(f"recovery_slope must be one of {_SLOPES}")
         self.alpha = alpha
         self.theta_mult = theta_mult
         self.gamma = gamma
         self.beta = beta
         self.tau = tau
+        self.window = window
+        self.recovery_len = recovery_len
+        self.recovery_slope = recovery_slope
+        self.theta_irrev = theta_irrev
+        self.epsilon = epsilon
 
         # State variables
         self.v_t = 0.0  # EWMA variance-like accumulator
         self.theta_t = 0.0  # cumulative risk
         self.turn = 0
-        self.history: List[Tuple[int, float, bool]] = []
+        self.history = HazardHistory(history_cap)
+
+        # Running (Welford) statistics of past hazards for the adaptive threshold;
+        # the `window` ring is allocated on the first turn
+        self._n = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._window_vals: Optional[array] = None
+
+        # Ring of the last `recovery_len` hazards (allocated on the first turn)
+        # with running sum and index-weighted sum (index 0 = oldest) for O(1)
+        # slope estimates
+        self._rec_vals: Optional[array] = None
+        self._rec_sum = 0.0
+        self._rec_isum = 0.0
+
+    def _hazard_variance(self) -> float:
+        """Population variance of past hazards (equivalent to np.var)."""
+        if self._n == 0:
+            return 0.0
+        return max(self._m2, 0.0) / self._n
+
+    def _push_hazard(self, x: float) -> None:
+        """Fold one hazard into the running statistics in O(1)."""
+        if self.window is not None:
+            if self._window_vals is None:
+                self._window_vals = array("d", bytes(8 * self.window))
+            slot = (self.turn - 1) % self.window
+            old = self._window_vals[slot]
+            self._window_vals[slot] = x
+        if self.window is not None and self._n == self.window:
+            # Sliding update: replace the oldest value with the newest
+            mean_old = self._mean
+            self._mean = mean_old + (x - old) / self._n
+            self._m2 += (x - old) * (x - self._mean + old - mean_old)
+            return
+        self._n += 1
+        delta = x - self._mean
+        self._mean += delta / self._n
+        self._m2 += delta * (x - self._mean)
+
+    def _push_recent(self, x: float) -> None:
+        """Slide the recovery ring forward by one hazard in O(1)."""
+        w = self.recovery_len
+        if self._rec_vals is None:
+            self._rec_vals = array("d", bytes(8 * w))
+        slot = (self.turn - 1) % w
+        if self.turn > w:
+            old = self._rec_vals[slot]
+            # Drop the oldest (index 0), shift the rest down, append at index w-1
+            self._rec_isum += old - self._rec_sum + (w - 1) * x
+            self._rec_sum += x - old
+        else:
+            self._rec_isum += (self.turn - 1) * x
+            self._rec_sum += x
+        self._rec_vals[slot] = x
+
+    @overload
+    def update(self, features: Dict[str, float],
+               with_recovery: Literal[False] = ...) -> Tuple[float, bool]: ...
+
+    @overload
+    def update(self, features: Dict[str, float],
+               with_recovery: Literal[True]) -> Tuple[float, bool, float]: ...
 
-    def update(self, features: Dict[str, float]) -> Tuple[float, bool]:
+    def update(
+        self, features: Dict[str, float], with_recovery: bool = False
+    ) -> Union[Tuple[float, bool], Tuple[float, bool, float]]:
         """
         Process one conversation turn.
 
         Args:
             features: Dict with keys 'linguistic', 'behavioral',
                       'temporal', 'resilience'
+            with_recovery: Also return the recovery window W(t)
 
         Returns:
-            (hazard, crisis_flag): Current hazard and whether crisis detected
+            (hazard, crisis_flag): Current hazard and whether crisis detected,
+            or (hazard, crisis_flag, recovery_window) with `with_recovery`
         """
         self.turn += 1
 
@@ -59,19 +272,20 @@ class UTLDetector:
         self.v_t = self.alpha * (r_t ** 2) + (1 - self.alpha) * self.v_t
 
         # Adaptive threshold from history variance (fallback to 1.0)
-        if self.history:
-            hist_vals = [h for _, h, _ in self.history]
-            theta_adapt = self.theta_mult * (np.var(hist_vals) + 1e-6)
+        if self._n:
+            theta_adapt = self.theta_mult * (self._hazard_variance() + 1e-6)
         else:
             theta_adapt = 1.0
 
         s = 0.5 * theta_adapt if theta_adapt > 0 else 0.5
-        # Logistic hazard
-        h_t = 1.0 / (1.0 + np.exp(-(self.v_t - theta_adapt) / max(s, 1e-6)))
+        # Logistic hazard (scalar math: NumPy dispatch costs more than the
+        # arithmetic for one turn; exp overflow means a hazard of 0)
+        z = (self.v_t - theta_adapt) / max(s, 1e-6)
+        h_t = 1.0 / (1.0 + math.exp(-z)) if z > -700.0 else 0.0
 
         # Coupled hazard (simplified) with resilience
         h_net = h_t - self.beta * features.get('resilience', 0.0)
-        h_net = float(np.clip(h_net, 0.0, 1.0))
+        h_net = float(min(max(h_net, 0.0), 1.0))
 
         # Cumulative risk
         self.theta_t += h_net
@@ -81,28 +295,120 @@ class UTLDetector:
 
         # Store history
         self.history.append((self.turn, h_net, crisis))
+        self._push_hazard(h_net)
+        self._push_recent(h_net)
 
+        if with_recovery:
+            return h_net, crisis, self.get_recovery_window()
         return h_net, crisis
 
-    def get_recovery_window(self, theta_irrev: float = 10.0, epsilon: float = 0.1) -> float:
+    def get_recovery_window(self, theta_irrev: Optional[float] = None,
+                            epsilon: Optional[float] = None) -> float:
         """
         Estimate recovery window W(t) in turns (rough heuristic).
+
+        Uses the slope of the last `recovery_len` hazards, kept incrementally,
+        so the cost is O(1) per call. `theta_irrev` and `epsilon` default to
+        the detector's parameters (as used by `update(with_recovery=True)`).
         """
-        if len(self.history) < 5:
+        if theta_irrev is None:
+            theta_irrev = self.theta_irrev
+        if epsilon is None:
+            epsilon = self.epsilon
+        w = self.recovery_len
+        if self.turn < w:
             return float("inf")
 
-        recent_hazards = [h for _, h, _ in self.history[-5:]]
-        lambda_t = (recent_hazards[-1] - recent_hazards[0]) / 5.0
+        if self.recovery_slope == "lstsq":
+            x_mean = (w - 1) / 2.0
+            lambda_t = (self._rec_isum - x_mean * self._rec_sum) / (w * (w * w - 1) / 12.0)
+        else:
+            newest = self._rec_vals[(self.turn - 1) % w]
+            oldest = self._rec_vals[self.turn % w]
+            lambda_t = (newest - oldest) / w
 
         if lambda_t <= 0:
             return float("inf")
 
-        W = (1.0 / lambda_t) * np.log(max((theta_irrev - self.theta_t), 1e-6) / max(epsilon, 1e-6))
+        W = (1.0 / lambda_t) * math.log(
+            max((theta_irrev - self.theta_t), 1e-6) / max(epsilon, 1e-6))
         return float(max(0.0, W))
 
+    def to_bytes(self, include_history: bool = True) -> bytes:
+        """
+        Serialize parameters and state into a compact binary snapshot.
+
+        Layout: fixed-size little-endian struct header, then the windowed
+        variance buffer (if `window` is set), the recovery ring, then
+        optionally the packed history (float64 hazards followed by int8
+        crisis flags).
+        """
+        hist = self.history
+        n_hist = len(hist) if include_history else 0
+        header = _SNAPSHOT.pack(
+            _SNAPSHOT_MAGIC, _SNAPSHOT_VERSION, _HAS_HISTORY if include_history else 0,
+            self.alpha, self.theta_mult, self.gamma, self.beta, self.tau,
+            -1 if self.window is None else self.window,
+            -1 if hist.cap is None else hist.cap,
+            self.turn, self.v_t, self.theta_t, self._n, self._mean, self._m2,
+            self.recovery_len, _SLOPES.index(self.recovery_slope), self._rec_sum, self._rec_isum,
+            self.theta_irrev, self.epsilon, n_hist,
+        )
+        parts = [header]
+        if self.window is not None:
+            parts.append(_to_le(self._window_vals) if self._window_vals is not None
+                         else bytes(8 * self.window))
+        parts.append(_to_le(self._rec_vals) if self._rec_vals is not None
+                     else bytes(8 * self.recovery_len))
+        if n_hist:
+            head = hist._head
+            parts.append(_to_le(hist._hazards[head:] + hist._hazards[:head]))
+            parts.append((hist._flags[head:] + hist._flags[:head]).tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "UTLDetector":
+        """Restore a detector from a `to_bytes` snapshot."""
+        if len(data) < _SNAPSHOT.size:
+            raise ValueError("snapshot too short")
+        (magic, version, flags, alpha, theta_mult, gamma, beta, tau, window, cap,
+         turn, v_t, theta_t, n, mean, m2, rec_len, slope, rec_sum, rec_isum,
+         theta_irrev, epsilon, n_hist) = _SNAPSHOT.unpack_from(data)
+        if magic != _SNAPSHOT_MAGIC or version != _SNAPSHOT_VERSION:
+            raise ValueError("not a UTLDetector snapshot (or unsupported version)")
+        det = cls(alpha=alpha, theta_mult=theta_mult, gamma=gamma, beta=beta, tau=tau,
+                  window=None if window < 0 else window,
+                  history_cap=None if cap < 0 else cap,
+                  recovery_len=rec_len, recovery_slope=_SLOPES[slope],
+                  theta_irrev=theta_irrev, epsilon=epsilon)
+        det.turn, det.v_t, det.theta_t = turn, v_t, theta_t
+        det._n, det._mean, det._m2 = n, mean, m2
+        det._rec_sum, det._rec_isum = rec_sum, rec_isum
+        off = _SNAPSHOT.size
+        expected = off + 8 * max(window, 0) + 8 * rec_len + 9 * n_hist
+        if len(data) != expected:
+            raise ValueError("snapshot length does not match header")
+        if window > 0:
+            det._window_vals = _from_le("d", data[off:off + 8 * window])
+            off += 8 * window
+        det._rec_vals = _from_le("d", data[off:off + 8 * rec_len])
+        off += 8 * rec_len
+        if flags & _HAS_HISTORY and n_hist:
+            det.history._hazards = _from_le("d", data[off:off + 8 * n_hist])
+            det.history._flags = _from_le("b", data[off + 8 * n_hist:])
+        det.history._last_turn = turn
+        return det
+
     def reset(self):
         """Reset detector state for a new conversation."""
         self.v_t = 0.0
         self.theta_t = 0.0
         self.turn = 0
-        self.history = []
+        self.history.clear()
+        self._n = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._window_vals = None
+        self._rec_vals = None
+        self._rec_sum = 0.0
+        self._rec_isum = 0.0
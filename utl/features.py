@@ -3,58 +3,224 @@ Feature extraction skeletons for UTL (24 features for crisis chat).
 These are stubs with simple heuristics so the repo remains runnable
 without private datasets. Replace with your production extractors.
 """
-from typing import Dict, Any, List, Optional
-import json
+import os
 import re
-from pathlib import Path
-
-# Defaults (fallback mini-lexicon) – will be overridden if lexicon.json is found.
-DEFAULT_LEXICON = {
-    "suicidal_keywords": ["kill myself","suicide","end my life","want to die","end it all"],
-    "method_nouns": ["pills","rope","gun","knife","jump","overdose","hanging"],
-    "finality_phrases": ["goodbye","last time","won't see you again","take care"],
-    "isolation_markers": ["alone","nobody cares","isolated","no friends","no one understands"],
-    "implicit_ideation": ["sleep forever","not wake up","find peace","end the struggle"]
+import threading
+import warnings
+from collections import OrderedDict, deque
+from typing import Deque, Dict, FrozenSet, Optional, Tuple
+
+from .lexicon import (  # noqa: F401  (re-exported for backwards compatibility)
+    DEFAULT_LEXICON,
+    INLINE_PHRASES,
+    LexiconMatcher,
+    build_matcher,
+    current_lexicon,
+    get_lexicon,
+    get_matcher,
+    load_lexicon,
+)
+
+SELF_HARM_RE = re.compile(r"i('m| am)? (going to|will) (hurt|cut|kill) (myself|me)?")
+
+# Lexicon-derived module attributes, resolved lazily so importing this module
+# does no file I/O (see utl.lexicon)
+_LEX_SETS = {
+    "SUICIDAL_KEYWORDS": "suicidal_keywords",
+    "METHOD_NOUNS": "method_nouns",
+    "FINALITY": "finality_phrases",
+    "ISOLATION": "isolation_markers",
+    "IMPLICIT": "implicit_ideation",
 }
 
-def load_lexicon(path: Optional[str] = "data/lexicon.json") -> dict:
-    p = Path(path) if path else None
-    if p and p.exists():
-        try:
-            return json.loads(Path(path).read_text(encoding="utf-8"))
-        except Exception:
-            return DEFAULT_LEXICON
-    return DEFAULT_LEXICON
 
-_LEX = load_lexicon()
+def __getattr__(name: str):
+    if name in _LEX_SETS:
+        return set(x.lower() for x in get_lexicon().get(_LEX_SETS[name], []))
+    if name == "_LEX":
+        return get_lexicon()
+    if name == "_MATCHER":
+        return get_matcher()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class TurnFeatures(dict):
+    """Feature dict tagged with the `lexicon_version` that produced it."""
+
+    __slots__ = ("lexicon_version",)
+
+
+# Fixed feature order for array layouts (matches the dict built below)
+FEATURE_NAMES = (
+    "ling_suicidal_keywords", "ling_method_inquiries", "ling_hopelessness", "ling_finality",
+    "ling_isolation", "ling_self_harm_verbs", "ling_temporal_urgency", "ling_help_rejection",
+    "beh_turn_count", "beh_response_latency", "beh_topic_fixation", "beh_disclosure_depth",
+    "beh_escalation_rate",
+    "tmp_time_of_day", "tmp_day_of_week", "tmp_session_duration",
+    "pro_social_support", "pro_future_oriented", "pro_coping", "pro_help_seeking",
+    "pro_reasons_living", "pro_positive_affect",
+)
+
+# Features that depend only on the (lowercased) text and the lexicon
+TEXT_FEATURE_NAMES = (
+    "ling_suicidal_keywords", "ling_method_inquiries", "ling_hopelessness", "ling_finality",
+    "ling_isolation", "ling_self_harm_verbs", "ling_temporal_urgency", "ling_help_rejection",
+    "beh_disclosure_depth",
+    "pro_social_support", "pro_future_oriented", "pro_coping", "pro_help_seeking",
+    "pro_reasons_living", "pro_positive_affect",
+)
+
+ENV_FEATURE_CACHE = "UTL_FEATURE_CACHE"
+
+
+class TextFeatureCache:
+    """
+    Bounded LRU of text-only feature values keyed by (lexicon version, text).
+
+    Chat traffic repeats short turns ("ok", "thanks", "idk") constantly; a hit
+    skips the lowercase/scan work and only the turn- and session-dependent
+    fields are recomputed. Keys include the lexicon version, so a reload
+    naturally misses instead of serving stale matches.
+
+    Parameters:
+        maxsize (int): Entries kept before evicting the least recently used
+        max_chars (int): Longer texts are scored but not cached (default: 200)
+    """
+
+    def __init__(self, maxsize: int = 4096, max_chars: int = 200):
+        if maxsize < 1:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.max_chars = max_chars
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str]) -> Optional[Tuple[float, ...]]:
+        with self._lock:
+            values = self._entries.get(key)
+            if values is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return values
+
+    def put(self, key: Tuple[str, str], values: Tuple[float, ...]) -> None:
+        with self._lock:
+            self._entries[key] = values
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        return dict(hits=self.hits, misses=self.misses, evictions=self.evictions,
+                    size=len(self._entries), maxsize=self.maxsize)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _cache_from_env() -> Optional[TextFeatureCache]:
+    """Cache sized by UTL_FEATURE_CACHE; unset, "0" or a bad value leaves it off."""
+    value = os.environ.get(ENV_FEATURE_CACHE, "").strip()
+    if value in ("", "0"):
+        return None
+    try:
+        return TextFeatureCache(int(value))
+    except ValueError:
+        warnings.warn(f"ignoring {ENV_FEATURE_CACHE}={value!r}: expected a positive entry "
+                      "count; the feature cache stays disabled", RuntimeWarning, stacklevel=2)
+        return None
+
+
+_FEATURE_CACHE: Optional[TextFeatureCache] = _cache_from_env()
+
+
+def enable_feature_cache(maxsize: int = 4096, max_chars: int = 200) -> TextFeatureCache:
+    """Turn on text-feature memoization (also via UTL_FEATURE_CACHE=<maxsize>)."""
+    global _FEATURE_CACHE
+    _FEATURE_CACHE = TextFeatureCache(maxsize, max_chars)
+    return _FEATURE_CACHE
+
+
+def disable_feature_cache() -> None:
+    global _FEATURE_CACHE
+    _FEATURE_CACHE = None
+
+
+def feature_cache() -> Optional[TextFeatureCache]:
+    """The active cache, or None when memoization is off (the default)."""
+    return _FEATURE_CACHE
+
+
+def _text_features(t: str, matcher: LexiconMatcher) -> Tuple[float, ...]:
+    """Values for TEXT_FEATURE_NAMES from lowercased text."""
+    counts = matcher.count(t)
+
+    def cap01(x, cap=3.0):
+        return min(1.0, float(x)/cap)
+
+    return (
+        # Linguistic (8) – counts normalized to [0,1] range with simple caps
+        cap01(counts.get("suicidal_keywords", 0)),
+        1.0 if (counts["method_cue"] and counts.get("method_nouns", 0)) else 0.0,
+        1.0 if counts["hopelessness"] else 0.0,
+        cap01(counts.get("finality_phrases", 0)),
+        cap01(counts.get("isolation_markers", 0)),
+        1.0 if SELF_HARM_RE.search(t) else 0.0,
+        1.0 if counts["temporal_urgency"] else 0.0,
+        1.0 if counts["help_rejection"] else 0.0,
+        # Disclosure depth (behavioral, but a function of the text alone)
+        min(1.0, len(t.split()) / 100.0),
+        # Protective (6) – crude heuristics
+        1.0 if counts["social_support"] else 0.0,
+        1.0 if counts["future_plan"] else 0.0,
+        1.0 if counts["coping"] else 0.0,
+        1.0 if counts["help_seeking"] else 0.0,
+        1.0 if counts["reasons_living"] else 0.0,
+        1.0 if counts["positive_emotion"] else 0.0,
+    )
+
 
-SUICIDAL_KEYWORDS = set(x.lower() for x in _LEX.get("suicidal_keywords", []))
-METHOD_NOUNS = set(x.lower() for x in _LEX.get("method_nouns", []))
-FINALITY = set(x.lower() for x in _LEX.get("finality_phrases", []))
-ISOLATION = set(x.lower() for x in _LEX.get("isolation_markers", []))
-IMPLICIT = set(x.lower() for x in _LEX.get("implicit_ideation", []))
+def _lookup_text_features(t: str, lex) -> Tuple[float, ...]:
+    """`_text_features` through the feature cache when it is enabled."""
+    cache = _FEATURE_CACHE
+    if cache is None or len(t) > cache.max_chars:
+        return _text_features(t, lex.matcher)
+    key = (lex.version, t)
+    values = cache.get(key)
+    if values is None:
+        values = _text_features(t, lex.matcher)
+        cache.put(key, values)
+    return values
 
-def extract_turn_features(text: str, turn_index: int, session_minutes: float = 0.0) -> Dict[str, float]:
+
+def extract_turn_features(text: str, turn_index: int, session_minutes: float = 0.0) -> TurnFeatures:
     """
-    Return a minimal dict of 24 features (many are simplified placeholders).
+    Return a minimal dict of 24 features (many are simplified placeholders),
+    tagged with the `lexicon_version` that produced it.
+
+    With the feature cache enabled, the text-only features of short turns are
+    memoized per (lexicon version, lowercased text).
     """
     t = (text or "").lower()
 
-    # Linguistic (8) – counts normalized to [0,1] range with simple caps
-    suicidal_kw = sum(1 for kw in SUICIDAL_KEYWORDS if kw in t)
-    method_inq = 1.0 if ("how to" in t and any(m in t for m in METHOD_NOUNS)) else 0.0
-    hopelessness = 1.0 if any(x in t for x in ["no hope","hopeless","pointless"]) else 0.0
-    finality = sum(1 for p in FINALITY if p in t)
-    isolation = sum(1 for p in ISOLATION if p in t)
-    self_harm_verbs = 1.0 if re.search(r"i('m| am)? (going to|will) (hurt|cut|kill) (myself|me)?", t) else 0.0
-    temporal_urgency = 1.0 if any(x in t for x in ["tonight","right now","today"]) else 0.0
-    help_rejection = 1.0 if any(x in t for x in ["won't work","tried that","no point"]) else 0.0
+    lex = current_lexicon()  # one snapshot per turn, even if a reload lands meanwhile
+    values = _lookup_text_features(t, lex)
+    (suicidal, method_inq, hopelessness, finality, isolation, self_harm, urgency, rejection,
+     disclosure_depth, social, future, coping, help_seeking, reasons, pos_emotion) = values
 
     # Behavioral (5) – simplified placeholders
     turn_count = float(max(1, turn_index))
     response_latency = 0.0  # unknown without timestamps
     topic_fixation = 0.0    # unknown without previous turn; placeholder
-    disclosure_depth = min(1.0, len(t.split()) / 100.0)
     escalation_rate = 0.0   # requires hazard history
 
     # Temporal (3)
@@ -62,27 +228,16 @@ def extract_turn_features(text: str, turn_index: int, session_minutes: float = 0
     dow = 0.0    # binary if weekend, placeholder
     session_dur = min(1.0, float(session_minutes) / 120.0)
 
-    # Protective (6) – crude heuristics
-    social_support = 1.0 if "friend" in t or "family" in t else 0.0
-    future_plan = 1.0 if any(x in t for x in ["next week","tomorrow","plan to"]) else 0.0
-    coping = 1.0 if any(x in t for x in ["meditation","walk","breathing","exercise"]) else 0.0
-    help_seeking = 1.0 if any(x in t for x in ["can you recommend","where can i get help","help line"]) else 0.0
-    reasons_living = 1.0 if any(x in t for x in ["my kids","responsibilities","job"]) else 0.0
-    pos_emotion = 1.0 if any(x in t for x in ["grateful","thankful","hopeful"]) else 0.0
-
-    def cap01(x, cap=3.0):
-        return min(1.0, float(x)/cap)
-
-    return {
+    feats = TurnFeatures({
         # Linguistic (8)
-        "ling_suicidal_keywords": cap01(suicidal_kw),
+        "ling_suicidal_keywords": suicidal,
         "ling_method_inquiries": method_inq,
         "ling_hopelessness": hopelessness,
-        "ling_finality": cap01(finality),
-        "ling_isolation": cap01(isolation),
-        "ling_self_harm_verbs": self_harm_verbs,
-        "ling_temporal_urgency": temporal_urgency,
-        "ling_help_rejection": help_rejection,
+        "ling_finality": finality,
+        "ling_isolation": isolation,
+        "ling_self_harm_verbs": self_harm,
+        "ling_temporal_urgency": urgency,
+        "ling_help_rejection": rejection,
         # Behavioral (5)
         "beh_turn_count": min(1.0, turn_count/30.0),
         "beh_response_latency": response_latency,
@@ -94,10 +249,163 @@ def extract_turn_features(text: str, turn_index: int, session_minutes: float = 0
         "tmp_day_of_week": dow,
         "tmp_session_duration": session_dur,
         # Protective (6)
-        "pro_social_support": social_support,
-        "pro_future_oriented": future_plan,
+        "pro_social_support": social,
+        "pro_future_oriented": future,
         "pro_coping": coping,
         "pro_help_seeking": help_seeking,
-        "pro_reasons_living": reasons_living,
+        "pro_reasons_living": reasons,
         "pro_positive_affect": pos_emotion,
-    }
+    })
+    feats.lexicon_version = lex.version
+    return feats
+
+
+_TEXT_COLS = tuple(FEATURE_NAMES.index(n) for n in TEXT_FEATURE_NAMES)
+
+# Matcher handed to pool workers once by the initializer (not per chunk)
+_WORKER_MATCHER: Optional[LexiconMatcher] = None
+
+
+def _init_worker(matcher: LexiconMatcher) -> None:
+    global _WORKER_MATCHER
+    _WORKER_MATCHER = matcher
+
+
+def _text_chunk(texts) -> list:
+    return [_text_features((t or "").lower(), _WORKER_MATCHER) for t in texts]
+
+
+def extract_features_batch(texts, turn_indices=None, session_minutes=None,
+                           workers: int = 1, chunksize: int = 20_000):
+    """
+    Features for many turns as one contiguous float32 matrix.
+
+    Equivalent to stacking `extract_turn_features` rows, without building a
+    dict per turn: text-only features are computed per text and the turn and
+    session columns are filled in vectorized.
+
+    Args:
+        texts: Sequence of turn texts (None is treated as empty)
+        turn_indices: Turn number per text (default 1)
+        session_minutes: Session duration per text (default 0)
+        workers: Processes for the text scan (1 = in-process)
+        chunksize: Texts per task with workers > 1
+
+    Returns:
+        (X, names): (N, len(FEATURE_NAMES)) C-contiguous float32 array and
+        FEATURE_NAMES giving its column order
+    """
+    import numpy as np
+
+    texts = list(texts)
+    n = len(texts)
+    lex = current_lexicon()  # one lexicon version for the whole batch
+    if workers > 1 and n > chunksize:
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import get_context
+        chunks = [texts[a:a + chunksize] for a in range(0, n, chunksize)]
+        # The compiled matcher is pickled once per worker; no lexicon re-parse
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"),
+                                 initializer=_init_worker, initargs=(lex.matcher,)) as pool:
+            values = [row for part in pool.map(_text_chunk, chunks) for row in part]
+    else:
+        values = [_lookup_text_features((t or "").lower(), lex) for t in texts]
+
+    X = np.zeros((n, len(FEATURE_NAMES)), dtype=np.float32)
+    if n:
+        X[:, _TEXT_COLS] = np.asarray(values, dtype=np.float32)
+    turns = np.ones(n) if turn_indices is None else np.asarray(turn_indices, dtype=np.float64)
+    if session_minutes is None:
+        minutes = np.zeros(n)
+    else:
+        minutes = np.asarray(session_minutes, dtype=np.float64)
+    X[:, FEATURE_NAMES.index("beh_turn_count")] = np.minimum(1.0, np.maximum(1.0, turns) / 30.0)
+    X[:, FEATURE_NAMES.index("tmp_session_duration")] = np.minimum(1.0, minutes / 120.0)
+    return X, FEATURE_NAMES
+
+
+class ConversationFeatureState:
+    """
+    Incremental per-conversation context for the behavioral features that
+    `extract_turn_features` cannot see from a single turn.
+
+    Keeps only the previous turn's token set, the first/last timestamps and a
+    short rolling window of detector hazards, so each turn costs O(turn length)
+    regardless of how long the conversation is. Typical use next to a detector:
+
+        feats = state.extract(text, timestamp)
+        hazard, crisis = detector.update(channels)
+        state.observe_hazard(hazard)
+
+    Parameters:
+        latency_cap (float): Seconds mapped to a latency feature of 1.0 (default: 300)
+        hazard_window (int): Hazards kept for the escalation slope (default: 5)
+    """
+
+    def __init__(self, latency_cap: float = 300.0, hazard_window: int = 5):
+        if hazard_window < 2:
+            raise ValueError("hazard_window must be at least 2")
+        self.latency_cap = latency_cap
+        self.turn_index = 0
+        self.prev_tokens: FrozenSet[str] = frozenset()
+        self.start_ts: Optional[float] = None
+        self.last_ts: Optional[float] = None
+        self.hazards: Deque[float] = deque(maxlen=hazard_window)
+
+    def extract(self, text: str, timestamp: Optional[float] = None) -> TurnFeatures:
+        """
+        Extract features for the next turn and advance the state.
+
+        Args:
+            text: Turn text
+            timestamp: Turn time in seconds (e.g. epoch); enables latency and
+                       session duration
+
+        Returns:
+            Feature dict as from `extract_turn_features`, with the
+            response latency, topic fixation and escalation rate filled in
+        """
+        self.turn_index += 1
+        if timestamp is not None and self.start_ts is None:
+            self.start_ts = timestamp
+        if timestamp is not None:
+            minutes = (timestamp - self.start_ts) / 60.0
+        elif self.last_ts is not None:
+            # No timestamp on this turn: keep the session length seen so far
+            minutes = (self.last_ts - self.start_ts) / 60.0
+        else:
+            minutes = 0.0
+        feats = extract_turn_features(text, self.turn_index, session_minutes=minutes)
+
+        # Response latency: time since the previous turn, capped
+        if timestamp is not None and self.last_ts is not None:
+            gap = max(0.0, timestamp - self.last_ts)
+            feats["beh_response_latency"] = min(1.0, gap / self.latency_cap)
+
+        # Topic fixation: Jaccard overlap with the previous turn's vocabulary
+        tokens = frozenset((text or "").lower().split())
+        union = len(tokens | self.prev_tokens)
+        if union:
+            feats["beh_topic_fixation"] = len(tokens & self.prev_tokens) / union
+
+        # Escalation: mean per-turn hazard increase over the rolling window
+        if len(self.hazards) >= 2:
+            slope = (self.hazards[-1] - self.hazards[0]) / (len(self.hazards) - 1)
+            feats["beh_escalation_rate"] = min(1.0, max(0.0, slope))
+
+        self.prev_tokens = tokens
+        if timestamp is not None:
+            self.last_ts = timestamp
+        return feats
+
+    def observe_hazard(self, hazard: float) -> None:
+        """Record the detector hazard produced for the latest turn."""
+        self.hazards.append(float(hazard))
+
+    def reset(self):
+        """Reset state for a new conversation."""
+        self.turn_index = 0
+        self.prev_tokens = frozenset()
+        self.start_ts = None
+        self.last_ts = None
+        self.hazards.clear()
@@ -0,0 +1,125 @@
+"""
+UTL Framework: Compiled hazard-scan kernel
+Runs the UTLDetector recurrence over a whole dataset in one call.
+
+The recurrence is sequential within a conversation, so the kernel loops over
+turns per conversation and parallelizes across conversations with `prange`.
+With numba installed the loop is JIT-compiled (parallel, cached on disk);
+without it the same function runs as plain Python, where `prange` is `range`.
+
+The threading layer is numba's, process-wide, and left alone here. Numba's
+TBB layer is not fork-safe, so the package's process pools (loader, tuner,
+synth, batch feature extraction) start their workers with "spawn" rather
+than forking a process that may have run this kernel. Workqueue does not
+allow concurrent launches, so under that layer calls are serialized; TBB
+and OpenMP launches run concurrently.
+"""
+import math
+import threading
+from contextlib import nullcontext
+from typing import Optional, Tuple
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # optional dependency
+    numba = None
+
+HAVE_NUMBA = numba is not None
+prange = numba.prange if HAVE_NUMBA else range
+_launch_lock = threading.Lock()
+
+
+def _launch_guard():
+    """Lock for layers that cannot launch concurrently (workqueue, or not yet chosen)."""
+    try:
+        layer = numba.threading_layer()
+    except ValueError:  # no parallel kernel has run yet
+        return _launch_lock
+    return nullcontext() if layer in ("tbb", "omp") else _launch_lock
+
+
+def _scan(offsets, X, alpha, theta_mult, beta, window, hazards, theta_t):
+    for c in prange(len(offsets) - 1):
+        v_t = 0.0
+        n = 0
+        mean = 0.0
+        m2 = 0.0
+        theta = 0.0
+        buf = [0.0] * max(window, 1)
+        for i in range(offsets[c], offsets[c + 1]):
+            row = X[i]
+            r_t = (row[0] + row[1] + row[2]) / 3.0
+            v_t = alpha * (r_t ** 2) + (1 - alpha) * v_t
+
+            theta_adapt = theta_mult * (max(m2, 0.0) / n + 1e-6) if n else 1.0
+            s = 0.5 * theta_adapt if theta_adapt > 0 else 0.5
+            z = (v_t - theta_adapt) / max(s, 1e-6)
+            h_t = 1.0 / (1.0 + math.exp(-z)) if z > -700.0 else 0.0
+            h_net = min(max(h_t - beta * row[3], 0.0), 1.0)
+            hazards[i] = h_net
+            theta += h_net
+
+            # Running (optionally windowed) variance of past hazards
+            if window > 0:
+                slot = (i - offsets[c]) % window
+                old = buf[slot]
+                buf[slot] = h_net
+                if n == window:
+                    mean_old = mean
+                    mean = mean_old + (h_net - old) / n
+                    m2 += (h_net - old) * (h_net - mean + old - mean_old)
+                    continue
+            n += 1
+            delta = h_net - mean
+            mean += delta / n
+            m2 += delta * (h_net - mean)
+        theta_t[c] = theta
+
+
+_scan_jit = numba.njit(parallel=True, cache=True)(_scan) if HAVE_NUMBA else None
+
+
+def hazard_scan(
+    offsets,
+    X,
+    alpha: float = 0.15,
+    theta_mult: float = 1.5,
+    beta: float = 0.8,
+    window: Optional[int] = None,
+    jit: Optional[bool] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hazards for every row of a conversation-sorted dataset.
+
+    Args:
+        offsets: (C + 1,) row offsets; conversation c is rows offsets[c]:offsets[c + 1]
+        X: (N, 4) linguistic, behavioral, temporal, resilience values, rows
+            ordered by turn within each conversation
+        alpha, theta_mult, beta, window: As for UTLDetector
+        jit: Use the numba kernel (default: when numba is installed)
+
+    Returns:
+        (hazards, theta_t): (N,) hazards and (C,) cumulative risk per conversation
+    """
+    if window is not None and window < 1:
+        raise ValueError("window must be a positive integer or None")
+    offsets = np.ascontiguousarray(offsets, dtype=np.int64)
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    if X.ndim != 2 or X.shape[1] != 4:
+        raise ValueError("X must have shape (N, 4)")
+    hazards = np.zeros(len(X))
+    theta_t = np.zeros(max(len(offsets) - 1, 0))
+    use_jit = HAVE_NUMBA if jit is None else jit
+    if use_jit and not HAVE_NUMBA:
+        raise ImportError("jit=True requires numba")
+    if use_jit:
+        with _launch_guard():
+            _scan_jit(offsets, X, float(alpha), float(theta_mult), float(beta), window or 0,
+                      hazards, theta_t)
+    else:
+        # Plain Python floats are much faster than NumPy scalars in the loop
+        _scan(offsets.tolist(), X.tolist(), alpha, theta_mult, beta, window or 0,
+              hazards, theta_t)
+    return hazards, theta_t
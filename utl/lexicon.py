@@ -0,0 +1,328 @@
+"""
+Lexicon loading and compiled phrase matching for UTL feature extraction.
+
+The lexicon is resolved and compiled lazily on first use and then cached, so
+importing `utl` does no file I/O. Resolution order for the JSON lexicon:
+explicit `configure(path=...)`, $UTL_LEXICON, data/lexicon.json under the
+working directory, data/lexicon.json next to the package, DEFAULT_LEXICON.
+
+The active lexicon lives in a LexiconRegistry (`REGISTRY`) which can watch the
+source file and swap in a rebuilt matcher without restarting the process;
+every LexiconVersion carries a content-hash `version`.
+
+For cold starts a precompiled artifact can be shipped instead
+(`python -m utl.lexicon compile data/lexicon.json lexicon.pkl`) and selected
+with `configure(compiled=...)` or $UTL_LEXICON_COMPILED. Artifacts are
+pickles: only load files you built yourself.
+"""
+import json
+import os
+import re
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+# Defaults (fallback mini-lexicon) – used if no lexicon.json is found.
+DEFAULT_LEXICON = {
+    "suicidal_keywords": ["kill myself","suicide","end my life","want to die","end it all"],
+    "method_nouns": ["pills","rope","gun","knife","jump","overdose","hanging"],
+    "finality_phrases": ["goodbye","last time","won't see you again","take care"],
+    "isolation_markers": ["alone","nobody cares","isolated","no friends","no one understands"],
+    "implicit_ideation": ["sleep forever","not wake up","find peace","end the struggle"]
+}
+
+ENV_LEXICON = "UTL_LEXICON"
+ENV_COMPILED = "UTL_LEXICON_COMPILED"
+_PACKAGE_LEXICON = Path(__file__).parent.parent / "data" / "lexicon.json"
+_ARTIFACT_FORMAT = 1
+
+# Fixed phrase lists used by the heuristics below (not part of lexicon.json)
+INLINE_PHRASES = {
+    "method_cue": ["how to"],
+    "hopelessness": ["no hope", "hopeless", "pointless"],
+    "temporal_urgency": ["tonight", "right now", "today"],
+    "help_rejection": ["won't work", "tried that", "no point"],
+    "social_support": ["friend", "family"],
+    "future_plan": ["next week", "tomorrow", "plan to"],
+    "coping": ["meditation", "walk", "breathing", "exercise"],
+    "help_seeking": ["can you recommend", "where can i get help", "help line"],
+    "reasons_living": ["my kids", "responsibilities", "job"],
+    "positive_emotion": ["grateful", "thankful", "hopeful"],
+}
+
+def _trie_pattern(phrases: Iterable[str]) -> str:
+    """Regex alternation factored by common prefixes (longest match first)."""
+    trie: Dict[str, Any] = {}
+    for p in phrases:
+        node = trie
+        for ch in p:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        if "" in node:
+            return ("(?:" + body + ")?") if len(alts) == 1 else body + "?"
+        return body
+
+    return build(trie)
+
+
+class LexiconMatcher:
+    """
+    Multi-pattern phrase matcher compiled once from category phrase lists.
+
+    `count(text)` returns, per category, how many distinct phrases occur as
+    substrings of `text` (the same result as `sum(p in text for p in phrases)`).
+    Large lexicons are compiled into a single prefix-factored regex, so one pass
+    over the text serves every category and the cost per turn stops growing with
+    lexicon size. Below `regex_min_phrases` a flat substring scan over all
+    phrases is cheaper than the regex engine and is used instead.
+    """
+
+    def __init__(self, categories: Mapping[str, Iterable[str]], regex_min_phrases: int = 128):
+        self.categories = {name: frozenset(p.lower() for p in phrases if p)
+                           for name, phrases in categories.items()}
+        phrases = sorted(set().union(*self.categories.values()))
+        self._phrases = tuple(phrases)
+        self._phrase_cats = {p: tuple(c for c, ps in self.categories.items() if p in ps)
+                             for p in phrases}
+        # A lookahead finds at most one phrase per start position (the longest), so
+        # every phrase also implies the shorter phrases it contains.
+        self._implied = {p: tuple(q for q in phrases if q in p) for p in phrases}
+        self._regex: Optional[re.Pattern] = None
+        if phrases and len(phrases) >= regex_min_phrases:  # an empty trie would match ''
+            self._regex = re.compile(f"(?=({_trie_pattern(phrases)}))")
+
+    def matches(self, text: str) -> set:
+        """Return the set of phrases occurring in (already lowercased) `text`."""
+        if self._regex is None:
+            return {p for p in self._phrases if p in text}
+        found = set()
+        for p in self._regex.findall(text):
+            if p not in found:
+                found.update(self._implied[p])
+        return found
+
+    def count(self, text: str) -> Dict[str, int]:
+        """Count distinct matching phrases per category in (lowercased) `text`."""
+        counts = dict.fromkeys(self.categories, 0)
+        for p in self.matches(text):
+            for c in self._phrase_cats[p]:
+                counts[c] += 1
+        return counts
+
+
+def build_matcher(lexicon: Mapping[str, Iterable[str]]) -> LexiconMatcher:
+    """Compile the lexicon categories plus the inline heuristic phrases."""
+    categories = {k: v for k, v in lexicon.items() if isinstance(v, list)}
+    categories.update(INLINE_PHRASES)
+    return LexiconMatcher(categories)
+
+def load_lexicon(path: Optional[str] = "data/lexicon.json") -> dict:
+    p = Path(path) if path else None
+    if p and p.exists():
+        try:
+            return json.loads(p.read_text(encoding="utf-8"))
+        except Exception:
+            return DEFAULT_LEXICON
+    return DEFAULT_LEXICON
+
+
+def resolve_lexicon_path(path: Optional[str] = None) -> Optional[Path]:
+    """Return the lexicon.json that would be loaded, or None for DEFAULT_LEXICON."""
+    candidates = [path, os.environ.get(ENV_LEXICON), "data/lexicon.json", _PACKAGE_LEXICON]
+    for c in candidates:
+        if c and Path(c).exists():
+            return Path(c)
+    return None
+
+
+def save_compiled(lexicon: Mapping[str, Iterable[str]], dest: str) -> None:
+    """Write a precompiled matcher artifact for fast cold starts."""
+    import pickle
+    payload = {"format": _ARTIFACT_FORMAT, "lexicon": dict(lexicon),
+               "matcher": build_matcher(lexicon)}
+    Path(dest).write_bytes(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def load_compiled(src: str):
+    """Read a `save_compiled` artifact; returns (lexicon, matcher)."""
+    import pickle
+    payload = pickle.loads(Path(src).read_bytes())
+    if not isinstance(payload, dict) or payload.get("format") != _ARTIFACT_FORMAT:
+        raise ValueError(f"{src} is not a compiled UTL lexicon artifact")
+    return payload["lexicon"], payload["matcher"]
+
+
+def lexicon_version(lexicon: Mapping[str, Any]) -> str:
+    """Content hash identifying a lexicon (stable across processes)."""
+    import hashlib
+    blob = json.dumps(lexicon, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha1(blob).hexdigest()[:12]
+
+
+class LexiconVersion:
+    """Immutable snapshot of one lexicon and its compiled matcher."""
+
+    __slots__ = ("version", "lexicon", "matcher", "source", "mtime_ns")
+
+    def __init__(self, lexicon: Mapping[str, Any], matcher: LexiconMatcher,
+                 source: Optional[Path] = None, mtime_ns: int = 0):
+        self.version = lexicon_version(lexicon)
+        self.lexicon = lexicon
+        self.matcher = matcher
+        self.source = source
+        self.mtime_ns = mtime_ns
+
+
+class LexiconRegistry:
+    """
+    Holds the active LexiconVersion and swaps in rebuilt versions atomically.
+
+    Callers take `current()` once per extraction and use that snapshot
+    throughout, so a reload never changes the lexicon mid-turn: in-flight
+    work finishes on the old version and later calls see the new one.
+    `watch()` starts a daemon thread that polls the source file's mtime and
+    rebuilds the matcher off the request path when it changes; a file that
+    fails to parse (e.g. caught mid-write) leaves the current version in place.
+    """
+
+    def __init__(self, path: Optional[str] = None, compiled: Optional[str] = None):
+        self.path = path
+        self.compiled = compiled
+        self.reloads = 0
+        self.errors = 0
+        self._current: Optional[LexiconVersion] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def configure(self, path: Optional[str] = None, compiled: Optional[str] = None) -> None:
+        with self._lock:
+            self.path, self.compiled = path, compiled
+            self._current = None
+
+    def _source(self) -> Optional[Path]:
+        compiled = self.compiled or os.environ.get(ENV_COMPILED)
+        return Path(compiled) if compiled else resolve_lexicon_path(self.path)
+
+    def _build(self, strict: bool) -> LexiconVersion:
+        compiled = self.compiled or os.environ.get(ENV_COMPILED)
+        src = self._source()
+        mtime = src.stat().st_mtime_ns if src is not None and src.exists() else 0
+        if compiled:
+            lexicon, matcher = load_compiled(compiled)
+        elif src is None:
+            lexicon, matcher = DEFAULT_LEXICON, build_matcher(DEFAULT_LEXICON)
+        else:
+            lexicon = (json.loads(src.read_text(encoding="utf-8")) if strict
+                       else load_lexicon(str(src)))
+            matcher = build_matcher(lexicon)
+        return LexiconVersion(lexicon, matcher, src, mtime)
+
+    def current(self) -> LexiconVersion:
+        """The active version (built on first use)."""
+        cur = self._current
+        if cur is None:
+            with self._lock:
+                if self._current is None:
+                    self._current = self._build(strict=False)
+                cur = self._current
+        return cur
+
+    def reload(self) -> bool:
+        """Rebuild from the source now; returns True if a new version was swapped in."""
+        try:
+            new = self._build(strict=True)
+        except Exception:
+            self.errors += 1
+            return False
+        with self._lock:
+            old = self._current
+            self._current = new
+        if old is None or old.version != new.version:
+            self.reloads += 1
+            return True
+        return False
+
+    def check(self) -> bool:
+        """Reload if the source file changed since the active version was built."""
+        cur = self.current()
+        src = self._source()
+        try:
+            mtime = src.stat().st_mtime_ns if src is not None else 0
+        except OSError:
+            return False
+        if src == cur.source and mtime == cur.mtime_ns:
+            return False
+        return self.reload()
+
+    def watch(self, interval: float = 2.0) -> None:
+        """Poll for lexicon changes every `interval` seconds in a daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(interval):
+                self.check()
+
+        self._thread = threading.Thread(target=loop, name="utl-lexicon-watch", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+REGISTRY = LexiconRegistry()
+
+
+def configure(path: Optional[str] = None, compiled: Optional[str] = None) -> None:
+    """Select the lexicon JSON and/or compiled artifact for the default registry."""
+    REGISTRY.configure(path=path, compiled=compiled)
+
+
+def current_lexicon() -> LexiconVersion:
+    """The default registry's active LexiconVersion."""
+    return REGISTRY.current()
+
+
+def get_lexicon() -> dict:
+    """The active lexicon (loaded on first use)."""
+    return REGISTRY.current().lexicon
+
+
+def get_matcher() -> LexiconMatcher:
+    """The compiled matcher for the active lexicon (built on first use)."""
+    return REGISTRY.current().matcher
+
+
+def main(argv=None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 3 or args[0] != "compile":
+        print("usage: python -m utl.lexicon compile <lexicon.json> <out.pkl>")
+        return 2
+    # Strict: load_lexicon would fall back to DEFAULT_LEXICON on a bad path or JSON
+    try:
+        lexicon = json.loads(Path(args[1]).read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        print(f"error: cannot read lexicon {args[1]}: {e}", file=sys.stderr)
+        return 1
+    if not isinstance(lexicon, dict):
+        print(f"error: {args[1]} must contain a JSON object", file=sys.stderr)
+        return 1
+    save_compiled(lexicon, args[2])
+    print("Saved:", args[2])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Threshold metrics for hazard scores.
+
+A turn (or conversation) is predicted positive when its score is strictly
+greater than the threshold, as in the experiment scripts. Sweeps sort the
+scores once and read confusion counts off cumulative sums, so any number of
+thresholds costs O(n log n) overall.
+"""
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+
+def metrics_from_counts(tp, fp, tn, fn) -> Dict[str, float]:
+    """Precision/recall/F1/accuracy from confusion counts (0.0 when undefined)."""
+    n = tp + fp + tn + fn
+    prec = tp / (tp+fp) if (tp+fp)>0 else 0.0
+    rec = tp / (tp+fn) if (tp+fn)>0 else 0.0
+    acc = (tp+tn) / max(1, n)
+    f1 = 2*prec*rec/(prec+rec) if (prec+rec)>0 else 0.0
+    return dict(precision=prec, recall=rec, f1=f1, accuracy=acc,
+                tp=int(tp), fp=int(fp), tn=int(tn), fn=int(fn))
+
+
+def confusion(y_true, y_score, thr: float = 0.68) -> Dict[str, int]:
+    """Confusion counts for `y_score > thr`."""
+    y_true = np.asarray(y_true).astype(bool)
+    y_pred = np.asarray(y_score) > thr
+    tp = int(np.count_nonzero(y_pred & y_true))
+    fp = int(np.count_nonzero(y_pred & ~y_true))
+    fn = int(np.count_nonzero(~y_pred & y_true))
+    return dict(tp=tp, fp=fp, tn=len(y_true) - tp - fp - fn, fn=fn)
+
+
+def evaluate(y_true, y_score, thr: float = 0.68) -> Dict[str, float]:
+    """Metrics at a single threshold."""
+    return metrics_from_counts(**confusion(y_true, y_score, thr))
+
+
+def _safe_div(num, den) -> np.ndarray:
+    num = np.asarray(num, dtype=np.float64)
+    den = np.asarray(den, dtype=np.float64)
+    return np.divide(num, den, out=np.zeros_like(num), where=den > 0)
+
+
+def threshold_sweep(
+    y_true, y_score, thresholds: Optional[Sequence[float]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Metrics for many thresholds in one pass.
+
+    Args:
+        y_true: Binary labels
+        y_score: Scores (higher = more likely positive)
+        thresholds: Threshold grid; default is every distinct score
+
+    Returns:
+        Dict of arrays aligned with the thresholds: threshold, tp, fp, tn, fn,
+        precision, recall, f1, accuracy
+    """
+    y_true = np.asarray(y_true).astype(bool)
+    y_score = np.asarray(y_score, dtype=np.float64)
+    order = np.argsort(y_score, kind="stable")
+    s = y_score[order]
+    # cum_pos[k] = positives among the k lowest scores
+    cum_pos = np.r_[0, np.cumsum(y_true[order])]
+    n, n_pos = len(s), int(cum_pos[-1])
+    thr = np.unique(s) if thresholds is None else np.asarray(thresholds, dtype=np.float64)
+
+    below = np.searchsorted(s, thr, side="right")  # scores <= thr are predicted negative
+    fn = cum_pos[below]
+    tn = below - fn
+    tp = n_pos - fn
+    fp = (n - below) - tp
+    precision = _safe_div(tp, tp + fp)
+    recall = _safe_div(tp, np.full(len(thr), n_pos))
+    f1 = _safe_div(2 * precision * recall, precision + recall)
+    accuracy = (tp + tn) / max(1, n)
+    return dict(threshold=thr, tp=tp, fp=fp, tn=tn, fn=fn,
+                precision=precision, recall=recall, f1=f1, accuracy=accuracy)
+
+
+def roc_auc(y_true, y_score) -> float:
+    """Area under the ROC curve (Mann-Whitney statistic, ties count 1/2)."""
+    y_true = np.asarray(y_true).astype(bool)
+    y_score = np.asarray(y_score, dtype=np.float64)
+    n_pos = int(y_true.sum())
+    n_neg = len(y_true) - n_pos
+    if n_pos == 0 or n_neg == 0:
+        return float("nan")
+    order = np.argsort(y_score, kind="stable")
+    s = y_score[order]
+    # Average 1-based ranks over ties
+    starts = np.flatnonzero(np.r_[True, s[1:] != s[:-1]])
+    ends = np.r_[starts[1:], len(s)]
+    ranks = np.empty(len(s))
+    ranks[order] = np.repeat((starts + ends + 1) / 2.0, ends - starts)
+    u = ranks[y_true].sum() - n_pos * (n_pos + 1) / 2.0
+    return float(u / (n_pos * n_neg))
+
+
+def pr_auc(y_true, y_score) -> float:
+    """Average precision: sum over distinct thresholds of precision x recall increment."""
+    y_true = np.asarray(y_true).astype(bool)
+    y_score = np.asarray(y_score, dtype=np.float64)
+    n_pos = int(y_true.sum())
+    if n_pos == 0:
+        return float("nan")
+    order = np.argsort(-y_score, kind="stable")
+    s = y_score[order]
+    tp = np.cumsum(y_true[order])
+    # Evaluate at the last index of each tie group (predict score >= s)
+    last = np.r_[np.flatnonzero(s[1:] != s[:-1]), len(s) - 1]
+    tp = tp[last]
+    precision = tp / (last + 1)
+    recall = tp / n_pos
+    return float(np.sum(np.diff(np.r_[0.0, recall]) * precision))
+
+
+def summarize(y_true, y_score, thr: float = 0.68) -> Dict[str, float]:
+    """Threshold metrics at `thr` plus PR-AUC and ROC-AUC."""
+    m = evaluate(y_true, y_score, thr)
+    m.update(pr_auc=pr_auc(y_true, y_score), roc_auc=roc_auc(y_true, y_score))
+    return m
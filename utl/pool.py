@@ -0,0 +1,87 @@
+"""
+Warm in-process pool of per-conversation scoring state for online serving.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from .detector import UTLDetector
+from .features import ConversationFeatureState
+
+
+class Session:
+    """Detector plus incremental feature state for one live conversation."""
+
+    __slots__ = ("detector", "features", "last_seen")
+
+    def __init__(self, detector: UTLDetector, features: ConversationFeatureState):
+        self.detector = detector
+        self.features = features
+        self.last_seen = 0.0
+
+
+class DetectorPool:
+    """
+    LRU/TTL table of warm sessions keyed by conversation id.
+
+    Parameters:
+        max_sessions (int): Evict least-recently-used sessions beyond this count
+        ttl (float): Seconds of inactivity after which a session is dropped
+            (None disables expiry)
+        factory (callable): Builds the detector for a new conversation
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 100_000,
+        ttl: Optional[float] = 1800.0,
+        factory: Callable[[], UTLDetector] = UTLDetector,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.factory = factory
+        self.clock = clock
+        self.evictions = 0
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, conv_id: str) -> Session:
+        """Return the warm session for `conv_id`, creating it if needed."""
+        now = self.clock()
+        with self._lock:
+            sess = self._sessions.get(conv_id)
+            if sess is not None and self.ttl is not None and now - sess.last_seen > self.ttl:
+                del self._sessions[conv_id]
+                self.evictions += 1
+                sess = None
+            if sess is None:
+                sess = Session(self.factory(), ConversationFeatureState())
+                sess.last_seen = now
+                self._sessions[conv_id] = sess
+                self._evict(now)
+            else:
+                sess.last_seen = now
+                self._sessions.move_to_end(conv_id)
+            return sess
+
+    def _evict(self, now: float) -> None:
+        # Oldest-first order means expired sessions sit at the front
+        while self._sessions:
+            conv_id, sess = next(iter(self._sessions.items()))
+            expired = self.ttl is not None and now - sess.last_seen > self.ttl
+            if not expired and len(self._sessions) <= self.max_sessions:
+                break
+            del self._sessions[conv_id]
+            self.evictions += 1
+
+    def discard(self, conv_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(conv_id, None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, conv_id: str) -> bool:
+        return conv_id in self._sessions
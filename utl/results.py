@@ -0,0 +1,259 @@
+"""
+Columnar turn-level results store.
+
+A store is a directory with one `.npy` file per column, plus an index of
+conversation ids and row offsets (conversation c is rows
+offsets[c]:offsets[c + 1]) and a small meta.json:
+
+    results/crisis_turns/
+        conversation_id.npy  turn.npy  hazard.npy  crisis_label.npy
+        _conversations.npy   _offsets.npy          meta.json
+
+Readers np.load every file with mmap_mode="r", so opening a multi-GB store
+is O(1), whole columns are zero-copy memmaps and one conversation's rows are
+a slice. Writers append chunks to the column files (the .npy headers are
+rewritten with the final row count on close), so streaming output never has
+to fit in memory. Rows must arrive grouped by conversation.
+
+Columns must be numeric, except the conversation id column: string ids are
+stored as int64 codes (0, 1, ... in order of appearance) and the original
+ids are kept in _conversations.npy, indexed by code. An object column that
+holds only integers is stored as plain int64 ids.
+
+    with ResultsWriter("results/loader_turns", conv_col="conversation_id") as w:
+        w.append(frame)                       # any mapping of equal-length columns
+    res = open_results("results/loader_turns")
+    res["hazard"]                             # memmap over all rows
+    res.conversation(42)["hazard"]            # rows of one conversation
+"""
+import json
+import struct
+from pathlib import Path
+from typing import Dict, Iterator, Mapping, Optional, Tuple
+
+import numpy as np
+
+FORMAT_VERSION = 1
+_HEADER_LEN = 128  # fixed .npy header size, so the row count can be patched in place
+
+
+def _npy_header(dtype: np.dtype, n: int) -> bytes:
+    """A version 1.0 .npy header padded to exactly _HEADER_LEN bytes."""
+    d = repr({"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": (n,)})
+    body = d.encode("latin1")
+    pad = _HEADER_LEN - 10 - len(body) - 1
+    if pad < 0:
+        raise ValueError(f"dtype {dtype} does not fit the fixed .npy header")
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", _HEADER_LEN - 10) + body + b" " * pad + b"\n"
+
+
+def is_store(path) -> bool:
+    return (Path(path) / "meta.json").exists()
+
+
+def check_dtype(name: str, dtype, conv: bool = False) -> None:
+    """Raise TypeError unless a column of `dtype` can be stored (`conv`: the id column)."""
+    kind = getattr(dtype, "kind", None) or np.dtype(dtype).kind  # pandas dtypes have .kind
+    if kind in "biuf" or (conv and kind in "OUS"):
+        return
+    # Strings/objects have no fixed width across appends
+    raise TypeError(f"column {name!r} has non-numeric dtype {dtype}")
+
+
+def _int_ids(conv: np.ndarray) -> Optional[np.ndarray]:
+    """`conv` as int64 if it is an object array of integers, else None."""
+    if conv.dtype.kind != "O" or not len(conv):
+        return None
+    values = np.array(conv.tolist())
+    return values.astype(np.int64) if values.dtype.kind in "iu" else None
+
+
+class ResultsWriter:
+    """
+    Append-only writer for a results store.
+
+    Parameters:
+        path (str or Path): Store directory (created; existing column files are replaced)
+        conv_col (str): Column holding the conversation id used for the index
+    """
+
+    def __init__(self, path, conv_col: str = "conversation_id"):
+        self.path = Path(path)
+        self.conv_col = conv_col
+        self.n_rows = 0
+        self._files: Dict[str, object] = {}
+        self._dtypes: Dict[str, np.dtype] = {}
+        self._conv_ids = []
+        self._starts = []
+        self._last_conv = None
+        self._codes: Optional[Dict[object, int]] = None  # string id -> code
+        self.path.mkdir(parents=True, exist_ok=True)
+        meta = self.path / "meta.json"
+        if meta.exists():
+            meta.unlink()  # an interrupted rewrite must not look like a valid store
+
+    def append(self, frame: Mapping[str, np.ndarray]) -> None:
+        """Append equal-length columns (e.g. a DataFrame); the first call fixes the column set."""
+        cols = {name: np.asarray(frame[name]) for name in frame.keys()}
+        if self.conv_col not in cols:
+            raise ValueError(f"missing conversation column {self.conv_col!r}")
+        ints = _int_ids(cols[self.conv_col])
+        if ints is not None:
+            cols[self.conv_col] = ints
+        if not self._files:
+            for name, arr in cols.items():
+                check_dtype(name, arr.dtype, conv=name == self.conv_col)
+            if cols[self.conv_col].dtype.kind in "OUS":
+                self._codes = {}
+            for name, arr in cols.items():
+                dtype = arr.dtype
+                if name == self.conv_col and self._codes is not None:
+                    dtype = np.dtype(np.int64)
+                f = open(self.path / f"{name}.npy", "wb")
+                f.write(_npy_header(dtype, 0))
+                self._files[name] = f
+                self._dtypes[name] = dtype
+        elif set(cols) != set(self._files):
+            raise ValueError("column set differs from the first append")
+        n = len(cols[self.conv_col])
+        if not n:
+            return
+
+        conv = cols[self.conv_col]
+        new = np.r_[True, conv[1:] != conv[:-1]]
+        starts = np.flatnonzero(new)
+        continued = self._last_conv is not None and conv[0] == self._last_conv
+        if continued:
+            starts = starts[1:]  # first conversation continues from the previous chunk
+        if self._codes is not None:
+            first = len(self._codes) - continued
+            for key in conv[starts].tolist():
+                if key in self._codes:
+                    raise ValueError("rows are not grouped by conversation")
+                self._codes[key] = len(self._codes)
+            cols[self.conv_col] = np.cumsum(new) - 1 + first
+        else:
+            self._conv_ids.append(conv[starts])
+        self._starts.append(starts + self.n_rows)
+        self._last_conv = conv[-1]
+
+        for name, f in self._files.items():
+            f.write(np.ascontiguousarray(cols[name], dtype=self._dtypes[name]).tobytes())
+        self.n_rows += n
+
+    def close(self) -> None:
+        """Patch the row counts into the column headers and write the index."""
+        if not self._files:
+            raise ValueError("no columns were written")
+        for name, f in self._files.items():
+            f.seek(0)
+            f.write(_npy_header(self._dtypes[name], self.n_rows))
+            f.close()
+        if self._codes is not None:
+            conv_ids = np.array(list(self._codes), dtype=str)
+        elif self._conv_ids:
+            conv_ids = np.concatenate(self._conv_ids)
+        else:
+            conv_ids = np.empty(0, self._dtypes[self.conv_col])
+        if len(np.unique(conv_ids)) != len(conv_ids):
+            raise ValueError("rows are not grouped by conversation")
+        starts = np.concatenate(self._starts) if self._starts else []
+        offsets = np.r_[starts, self.n_rows].astype(np.int64)
+        np.save(self.path / "_conversations.npy", conv_ids)
+        np.save(self.path / "_offsets.npy", offsets)
+        meta = dict(version=FORMAT_VERSION, rows=self.n_rows, conv_col=self.conv_col,
+                    conv_codes=self._codes is not None,
+                    sorted=bool(np.all(conv_ids[1:] > conv_ids[:-1])),
+                    columns={k: np.lib.format.dtype_to_descr(v) for k, v in self._dtypes.items()})
+        (self.path / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        self._files = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            for f in self._files.values():
+                f.close()
+        return False
+
+
+def write_results(path, frame: Mapping[str, np.ndarray], conv_col: str = "conversation_id") -> None:
+    """Write a complete results table (rows grouped by conversation) in one call."""
+    with ResultsWriter(path, conv_col=conv_col) as w:
+        w.append(frame)
+
+
+class TurnResults:
+    """
+    Memory-mapped view of a results store.
+
+    Parameters:
+        path (str or Path): Store directory
+        mmap_mode (str): Passed to np.load (default 'r'; None loads into memory)
+    """
+
+    def __init__(self, path, mmap_mode: Optional[str] = "r"):
+        self.path = Path(path)
+        meta = json.loads((self.path / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"unsupported results store version {meta.get('version')}")
+        self.conv_col = meta["conv_col"]
+        self.conv_codes = meta["conv_codes"]
+        self._sorted = meta["sorted"]
+        self.columns = tuple(meta["columns"])
+        self._cols = {name: np.load(self.path / f"{name}.npy", mmap_mode=mmap_mode)
+                      for name in self.columns}
+        self.conversations = np.load(self.path / "_conversations.npy", mmap_mode=mmap_mode)
+        self.offsets = np.load(self.path / "_offsets.npy", mmap_mode=mmap_mode)
+        self._position: Optional[Dict] = None
+
+    def __len__(self) -> int:
+        return int(self.offsets[-1]) if len(self.offsets) else 0
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._cols[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._cols
+
+    def _locate(self, conv_id) -> int:
+        conv = self.conversations
+        if self._sorted:
+            i = int(np.searchsorted(conv, conv_id))
+            if i < len(conv) and conv[i] == conv_id:
+                return i
+            raise KeyError(conv_id)
+        if self._position is None:
+            self._position = {k: i for i, k in enumerate(conv.tolist())}
+        return self._position[conv_id]
+
+    def rows(self, conv_id) -> Tuple[int, int]:
+        """(start, stop) row range of one conversation."""
+        i = self._locate(conv_id)
+        return int(self.offsets[i]), int(self.offsets[i + 1])
+
+    def conversation(self, conv_id) -> Dict[str, np.ndarray]:
+        """Zero-copy column slices for one conversation (KeyError if absent)."""
+        a, b = self.rows(conv_id)
+        return {name: col[a:b] for name, col in self._cols.items()}
+
+    def iter_conversations(self) -> Iterator[Tuple[object, Dict[str, np.ndarray]]]:
+        """(conversation id, column slices) for every conversation in row order."""
+        for i, conv_id in enumerate(self.conversations.tolist()):
+            a, b = int(self.offsets[i]), int(self.offsets[i + 1])
+            yield conv_id, {name: col[a:b] for name, col in self._cols.items()}
+
+    def to_frame(self):
+        """Copy into a pandas DataFrame (string conversation ids are decoded)."""
+        import pandas as pd
+        cols = {name: np.asarray(col) for name, col in self._cols.items()}
+        if self.conv_codes:
+            cols[self.conv_col] = np.asarray(self.conversations)[cols[self.conv_col]]
+        return pd.DataFrame(cols)
+
+
+def open_results(path, mmap_mode: Optional[str] = "r") -> TurnResults:
+    return TurnResults(path, mmap_mode=mmap_mode)
@@ -0,0 +1,98 @@
+"""
+Detector state stores for horizontally scaled workers.
+
+Turns of one conversation may be scored by different processes; a store
+keeps each conversation's `UTLDetector.to_bytes()` snapshot so any worker
+can resume it. Implementations only deal in bytes keyed by conversation id.
+"""
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Optional
+
+from .detector import UTLDetector
+
+
+class StateStore(ABC):
+    """Pluggable key -> detector snapshot storage."""
+
+    include_history: bool = True
+
+    @abstractmethod
+    def get_bytes(self, conv_id: str) -> Optional[bytes]:
+        """Return the stored snapshot for `conv_id`, or None."""
+
+    @abstractmethod
+    def put_bytes(self, conv_id: str, data: bytes) -> None:
+        """Store (or replace) the snapshot for `conv_id`."""
+
+    @abstractmethod
+    def delete(self, conv_id: str) -> None:
+        """Forget `conv_id` (no error if absent)."""
+
+    def load(self, conv_id: str,
+             factory: Callable[[], UTLDetector] = UTLDetector) -> UTLDetector:
+        """Restore the detector for `conv_id`, or create a fresh one."""
+        data = self.get_bytes(conv_id)
+        return factory() if data is None else UTLDetector.from_bytes(data)
+
+    def save(self, conv_id: str, detector: UTLDetector) -> None:
+        self.put_bytes(conv_id, detector.to_bytes(include_history=self.include_history))
+
+
+class InMemoryStateStore(StateStore):
+    """Process-local dict store (tests, single-worker deployments)."""
+
+    def __init__(self, include_history: bool = True):
+        self.include_history = include_history
+        self._data: Dict[str, bytes] = {}
+
+    def get_bytes(self, conv_id: str) -> Optional[bytes]:
+        return self._data.get(conv_id)
+
+    def put_bytes(self, conv_id: str, data: bytes) -> None:
+        self._data[conv_id] = data
+
+    def delete(self, conv_id: str) -> None:
+        self._data.pop(conv_id, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteStateStore(StateStore):
+    """
+    SQLite-backed store shared by worker processes on one host (WAL mode).
+
+    Parameters:
+        path (str): Database file (":memory:" for a private in-process DB)
+        include_history (bool): Persist packed history with each snapshot
+    """
+
+    def __init__(self, path: str = "utl_state.sqlite3", include_history: bool = True):
+        self.include_history = include_history
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS detector_state (conv_id TEXT PRIMARY KEY, state BLOB)")
+
+    def get_bytes(self, conv_id: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state FROM detector_state WHERE conv_id = ?", (conv_id,)).fetchone()
+        return None if row is None else bytes(row[0])
+
+    def put_bytes(self, conv_id: str, data: bytes) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO detector_state (conv_id, state) VALUES (?, ?)",
+                (conv_id, data))
+
+    def delete(self, conv_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM detector_state WHERE conv_id = ?", (conv_id,))
+
+    def close(self) -> None:
+        self._conn.close()
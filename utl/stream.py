@@ -0,0 +1,174 @@
+"""
+Asyncio streaming scorer for live chat gateways.
+
+Consumes an async iterator of (conversation_id, text, timestamp) events and
+yields one HazardEvent per turn. Events that arrive within `batch_window`
+seconds of each other are scored as a micro-batch, so the queue hand-off,
+timing and sink scheduling are paid per batch rather than per event. Each
+turn still goes through the same float64 channel aggregation
+(`ChannelAggregator.channels`) and detector update as POST /score, and a
+micro-batch never holds two turns of the same conversation, so results are
+identical to scoring the turns one at a time.
+
+    scorer = StreamScorer(sink=page_on_call)
+    async for event in scorer.score(gateway_events()):
+        await publish(event)
+
+Backpressure: the source is read into a bounded queue (`max_pending`), so a
+slow consumer (or alert sink) stops the reader instead of buffering without
+limit.
+"""
+import asyncio
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from .channels import ChannelAggregator
+from .pool import DetectorPool
+from .timing import TIMER
+
+
+class HazardEvent(NamedTuple):
+    """Scored turn emitted by StreamScorer."""
+    conversation_id: str
+    turn: int
+    timestamp: Optional[float]
+    hazard: float
+    crisis: bool
+    cumulative_risk: float
+    lexicon_version: Optional[str]
+
+
+Event = Tuple[str, str, Optional[float]]
+AlertSink = Callable[[HazardEvent], Awaitable[None]]
+
+_DONE = object()
+
+
+class _SourceError:
+    __slots__ = ("exc",)
+
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+class StreamScorer:
+    """
+    Micro-batching async scorer over a warm DetectorPool.
+
+    Parameters:
+        pool (DetectorPool, optional): Per-conversation state (default: a new pool)
+        aggregator (ChannelAggregator, optional): Feature-to-channel weights
+        sink (callable, optional): `async def sink(event)` awaited for every
+            crisis-flagged turn before the event is yielded
+        batch_window (float): Seconds to keep collecting after the first event
+            of a micro-batch (default: 0.005; 0 takes only what is already queued)
+        max_batch (int): Upper bound on events per micro-batch (default: 256)
+        max_pending (int): Events read ahead of the scorer (default: 1024)
+    """
+
+    def __init__(
+        self,
+        pool: Optional[DetectorPool] = None,
+        aggregator: Optional[ChannelAggregator] = None,
+        sink: Optional[AlertSink] = None,
+        batch_window: float = 0.005,
+        max_batch: int = 256,
+        max_pending: int = 1024
+    ):
+        if max_batch < 1 or max_pending < 1:
+            raise ValueError("max_batch and max_pending must be positive")
+        self.pool = pool if pool is not None else DetectorPool()
+        self.aggregator = aggregator if aggregator is not None else ChannelAggregator()
+        self.sink = sink
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.alerts = 0
+
+    def score_batch(self, events: List[Event]) -> List[HazardEvent]:
+        """Score events in order; each conversation may appear at most once."""
+        sessions = [self.pool.get(conv_id) for conv_id, _, _ in events]
+        with TIMER.stage("features"):
+            feats = [s.features.extract(text or "", ts)
+                     for s, (_, text, ts) in zip(sessions, events, strict=True)]
+        with TIMER.stage("channels"):
+            C = [self.aggregator.channels(f) for f in feats]
+        out = []
+        with TIMER.stage("detector"):
+            for sess, f, ch, (conv_id, _, ts) in zip(sessions, feats, C, events, strict=True):
+                det = sess.detector
+                hazard, crisis = det.update(ch)
+                sess.features.observe_hazard(hazard)
+                out.append(HazardEvent(conv_id, det.turn, ts, float(hazard), bool(crisis),
+                                       float(det.theta_t), f.lexicon_version))
+        return out
+
+    async def score(self, events: AsyncIterable[Event]) -> AsyncIterator[HazardEvent]:
+        """Yield a HazardEvent for every input event, in arrival order."""
+        queue: asyncio.Queue = asyncio.Queue(self.max_pending)
+
+        async def pump():
+            try:
+                async for ev in events:
+                    await queue.put(ev)
+            except Exception as exc:  # surfaced to the consumer below
+                await queue.put(_SourceError(exc))
+            else:
+                await queue.put(_DONE)
+
+        reader = asyncio.create_task(pump())
+        carry = None
+        try:
+            while True:
+                batch, carry, done = await self._collect(queue, carry)
+                for event in self.score_batch(batch) if batch else ():
+                    if event.crisis and self.sink is not None:
+                        self.alerts += 1
+                        await self.sink(event)
+                    yield event
+                if done:
+                    break
+        finally:
+            reader.cancel()
+
+    async def _collect(self, queue: asyncio.Queue, carry):
+        """Gather one micro-batch; returns (batch, carried-over event, source done)."""
+        first = carry if carry is not None else await queue.get()
+        batch: List[Event] = []
+        seen = set()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_window
+        ev = first
+        while True:
+            if ev is _DONE:
+                return batch, None, True
+            if isinstance(ev, _SourceError):
+                if batch:
+                    return batch, ev, False
+                raise ev.exc
+            if ev[0] in seen:
+                return batch, ev, False
+            seen.add(ev[0])
+            batch.append(ev)
+            if len(batch) >= self.max_batch:
+                return batch, None, False
+            try:
+                ev = queue.get_nowait()
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                return batch, None, False
+            try:
+                ev = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                return batch, None, False
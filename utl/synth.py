@@ -0,0 +1,266 @@
+"""
+Synthetic conversation workloads in the demo_synthetic.csv schema.
+
+Each conversation gets a length, a crisis/no-crisis outcome and, if it
+escalates, an escalation profile; channel values are noisy functions of the
+escalation level, and crisis_label turns on at a per-conversation onset.
+Optionally a `text` column (phrases from the lexicon categories mixed into
+filler, more severe as the conversation escalates) and `timestamp` are added.
+
+Conversations are generated in fixed-size chunks, each from its own
+np.random seed sequence (seed, chunk index), so the output is identical for
+any number of workers. Chunks are written in order as they complete; memory
+stays bounded by a few chunks.
+
+Usage:
+    python -m utl.synth --out data/synth_10m.csv --conversations 800000 --workers 8
+    python -m utl.synth --out data/long.parquet --conversations 100 --length fixed:100000
+    python -m utl.synth --out data/text.csv --conversations 1000 --text
+"""
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .lexicon import get_lexicon
+
+PROFILES = ("linear", "sudden", "late")
+COLUMNS = ["conversation_id", "turn", "linguistic_hazard", "behavioral_hazard",
+           "temporal_hazard", "resilience_score", "crisis_label"]
+
+# Lexicon categories by severity; text for escalation e uses tier int(e * 3)
+_TIERS = (
+    (),
+    ("isolation_markers", "implicit_ideation"),
+    ("suicidal_keywords", "method_nouns", "finality_phrases"),
+)
+_FILLER = ("i", "just", "feel", "like", "today", "really", "so", "tired", "and", "it",
+           "is", "hard", "to", "talk", "about", "everything", "maybe", "work", "home", "again")
+
+
+def parse_length(spec: str):
+    """'uniform:lo:hi', 'lognormal:median:sigma' or 'fixed:n' -> (kind, a, b)."""
+    kind, *args = spec.split(":")
+    if kind == "fixed" and len(args) == 1:
+        return kind, float(args[0]), 0.0
+    if kind in ("uniform", "lognormal") and len(args) == 2:
+        return kind, float(args[0]), float(args[1])
+    raise ValueError(f"bad length spec {spec!r}")
+
+
+def _lengths(rng, n: int, length) -> np.ndarray:
+    kind, a, b = length
+    if kind == "fixed":
+        out = np.full(n, a)
+    elif kind == "uniform":
+        out = rng.integers(int(a), int(b) + 1, size=n)
+    else:
+        out = np.rint(rng.lognormal(np.log(a), b, size=n))
+    return np.maximum(out, 2).astype(np.int64)
+
+
+def _escalation(profile: np.ndarray, p: np.ndarray, onset: np.ndarray) -> np.ndarray:
+    """Escalation level in [0, 1] at conversation progress p (profile -1 = no crisis)."""
+    return np.select(
+        [profile == 0, profile == 1, profile == 2],
+        [p, 0.2 * p + 0.8 * (p >= onset), p ** 3],
+        default=0.35 * p,
+    )
+
+
+def _texts(rng, e: np.ndarray, lexicon: Dict[str, Sequence[str]]):
+    tiers = [[ph for c in cats for ph in lexicon.get(c, ())] for cats in _TIERS]
+    if not tiers[1] and not tiers[2]:
+        tiers[2] = [ph for v in lexicon.values() for ph in v]
+    tier = np.minimum((e * 3).astype(int), 2)
+    n_words = rng.integers(4, 16, size=len(e))
+    use = rng.random(len(e)) < 0.2 + 0.7 * e
+    picks = rng.random(len(e))
+    filler = rng.integers(0, len(_FILLER), size=int(n_words.sum()))
+    out, pos = [], 0
+    for i in range(len(e)):
+        words = [_FILLER[j] for j in filler[pos:pos + n_words[i]]]
+        pos += n_words[i]
+        phrases = tiers[tier[i]] or tiers[1] or tiers[2]
+        if use[i] and tier[i] > 0 and phrases:
+            words.insert(len(words) // 2, phrases[int(picks[i] * len(phrases))])
+        out.append(" ".join(words))
+    return out
+
+
+def generate_chunk(index: int, n_conversations: int, seed: int = 0,
+                   length=("uniform", 8, 17), prevalence: float = 0.36,
+                   profiles: Optional[Dict[str, float]] = None, text: bool = False,
+                   first_id: Optional[int] = None) -> pd.DataFrame:
+    """
+    One chunk of conversations, deterministic in (seed, index).
+
+    Args:
+        index: Chunk number; conversation ids start at `first_id`
+            (default index * n_conversations)
+        n_conversations: Conversations in this chunk
+        seed: Base seed
+        length: Conversation length distribution, as from `parse_length`
+        prevalence: Fraction of conversations that escalate to a crisis
+        profiles: Escalation profile weights over PROFILES (default equal)
+        text: Add `text` and `timestamp` columns
+
+    Returns:
+        DataFrame with COLUMNS (plus text/timestamp), sorted by conversation, turn
+    """
+    rng = np.random.default_rng([seed, index])
+    weights = np.array([(profiles or {}).get(p, 0.0 if profiles else 1.0) for p in PROFILES])
+    if weights.sum() <= 0:
+        raise ValueError(f"profiles must weight at least one of {PROFILES}")
+    first = index * n_conversations if first_id is None else first_id
+
+    L = _lengths(rng, n_conversations, length)
+    crisis = rng.random(n_conversations) < prevalence
+    drawn = rng.choice(len(PROFILES), size=n_conversations, p=weights / weights.sum())
+    profile = np.where(crisis, drawn, -1)
+    onset = rng.uniform(0.55, 0.85, size=n_conversations)
+
+    n = int(L.sum())
+    conv = np.repeat(np.arange(n_conversations), L)
+    starts = np.cumsum(L) - L
+    turn = np.arange(n) - np.repeat(starts, L) + 1
+    p = (turn - 1) / np.repeat(L - 1, L)
+    e = _escalation(profile[conv], p, onset[conv])
+
+    noise = rng.standard_normal((n, 3))
+    ling = np.clip(0.15 + 0.6 * e + 0.05 * noise[:, 0], 0.0, 1.0)
+    beh = np.clip(0.28 + 0.14 * noise[:, 1], 0.0, 1.0)
+    tmp = np.where(p >= 0.6, 0.2, 0.1)
+    res = np.clip(0.6 - 0.35 * e - 0.1 * p + 0.05 * noise[:, 2], 0.0, 1.0)
+    label = (crisis[conv] & (p >= onset[conv])).astype(np.int8)
+
+    df = pd.DataFrame({
+        "conversation_id": conv + first, "turn": turn,
+        "linguistic_hazard": ling, "behavioral_hazard": beh, "temporal_hazard": tmp,
+        "resilience_score": res, "crisis_label": label,
+    })
+    if text:
+        # Gaps shrink as the conversation escalates (faster, shorter replies)
+        gaps = rng.exponential(60.0 * (1.0 - 0.6 * e))
+        gaps[starts] = 0.0
+        t0 = np.repeat(rng.uniform(0, 86400 * 30, size=n_conversations), L)
+        ts = np.cumsum(gaps)
+        df["timestamp"] = t0 + ts - np.repeat(ts[starts], L)
+        df["text"] = _texts(rng, e, get_lexicon())
+    return df
+
+
+def _render(job):
+    fmt, kw = job
+    df = generate_chunk(**kw)
+    if fmt == "csv":
+        return len(df), df.to_csv(index=False, header=False)
+    return len(df), df
+
+
+def generate(out: str, n_conversations: int, chunk: int = 10_000, workers: int = 1,
+             **chunk_kw) -> int:
+    """
+    Write `n_conversations` synthetic conversations to CSV or Parquet (by suffix).
+
+    Args:
+        out: Output path (.csv, or .parquet/.pq which requires pyarrow)
+        n_conversations: Total conversations
+        chunk: Conversations per chunk
+        workers: Processes generating chunks (1 = in-process)
+        **chunk_kw: seed, length, prevalence, profiles, text (see generate_chunk)
+
+    Returns:
+        Number of rows written
+    """
+    path = Path(out)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fmt = "parquet" if path.suffix.lower() in (".parquet", ".pq") else "csv"
+    jobs = (
+        (fmt, dict(chunk_kw, index=i, n_conversations=min(chunk, n_conversations - a), first_id=a))
+        for i, a in enumerate(range(0, n_conversations, chunk))
+    )
+    columns = COLUMNS + (["timestamp", "text"] if chunk_kw.get("text") else [])
+
+    rows = 0
+    writer = None
+    with open(path, "w", encoding="utf-8", newline="") if fmt == "csv" else nullcontext() as f:
+        if fmt == "csv":
+            f.write(",".join(columns) + "\n")
+
+        def write(part):
+            nonlocal rows, writer
+            n, payload = part
+            rows += n
+            if fmt == "csv":
+                f.write(payload)
+                return
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(payload, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+
+        try:
+            if workers > 1:
+                # Keep a bounded number of chunks in flight; write in submission order
+                with ProcessPoolExecutor(max_workers=workers,
+                                         mp_context=get_context("spawn")) as pool:
+                    pending = deque()
+                    for job in jobs:
+                        pending.append(pool.submit(_render, job))
+                        if len(pending) >= 2 * workers:
+                            write(pending.popleft().result())
+                    while pending:
+                        write(pending.popleft().result())
+            else:
+                for job in jobs:
+                    write(_render(job))
+        finally:
+            if writer is not None:
+                writer.close()
+    return rows
+
+
+def _profiles(spec: str) -> Dict[str, float]:
+    out = {}
+    for pair in spec.split(","):
+        name, _, w = pair.partition("=")
+        if name.strip() not in PROFILES:
+            raise ValueError(f"unknown profile {name!r}; choose from {PROFILES}")
+        out[name.strip()] = float(w or 1.0)
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Generate synthetic crisis-chat workloads")
+    ap.add_argument("--out", required=True, help=".csv or .parquet output path")
+    ap.add_argument("--conversations", type=int, default=50)
+    ap.add_argument("--length", default="uniform:8:17",
+                    help="uniform:lo:hi, lognormal:median:sigma or fixed:n turns")
+    ap.add_argument("--prevalence", type=float, default=0.36,
+                    help="fraction of crisis conversations")
+    ap.add_argument("--profiles", default=",".join(PROFILES),
+                    help="escalation profile weights, e.g. linear=0.5,sudden=0.3,late=0.2")
+    ap.add_argument("--text", action="store_true",
+                    help="add text (from the lexicon) and timestamp columns")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--chunk", type=int, default=10_000, help="conversations per chunk")
+    ap.add_argument("--workers", type=int, default=1)
+    args = ap.parse_args(argv)
+
+    rows = generate(args.out, args.conversations, chunk=args.chunk, workers=args.workers,
+                    seed=args.seed, length=parse_length(args.length), prevalence=args.prevalence,
+                    profiles=_profiles(args.profiles), text=args.text)
+    print(f"Saved: {args.out} ({rows} rows)")
+
+
+if __name__ == "__main__":
+    main()
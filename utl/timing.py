@@ -0,0 +1,168 @@
+"""
+Per-stage latency histograms for the scoring pipeline.
+
+Callers wrap pipeline stages (feature extraction, channel aggregation,
+detector update, ...) in `TIMER.stage(name)`. While the timer is disabled,
+which is the default unless UTL_TIMING is set, `stage()` returns a shared
+no-op context manager, so the cost is one attribute check. When enabled,
+each span adds its duration to a fixed-bucket histogram and is passed to any
+registered hooks.
+
+    from utl.timing import TIMER
+    TIMER.enable()
+    with TIMER.stage("features"):
+        feats = extract_turn_features(text, turn)
+    print(TIMER.summary())          # table for experiment scripts
+    body = TIMER.render_prometheus()  # text exposition format
+
+Updates are not locked: they are a few integer/float additions under the
+GIL, and a lost increment under heavy threading only skews the counts.
+"""
+import os
+from bisect import bisect_left
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Sequence
+
+ENV_TIMING = "UTL_TIMING"
+
+# Upper bounds in seconds: 1us .. 10s, about 3 buckets per decade
+BUCKETS = tuple(float(f"{m}e{e}") for e in range(-6, 1) for m in (1, 2.5, 5)) + (10.0,)
+
+Hook = Callable[[str, float], None]
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram (Prometheus semantics)."""
+
+    __slots__ = ("bounds", "counts", "count", "total")
+
+    def __init__(self, bounds: Sequence[float] = BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last slot = +Inf
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, q: float) -> float:
+        """Approximate quantile by linear interpolation within the bucket."""
+        if not self.count:
+            return float("nan")
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if c and seen + c >= rank:
+                lo = self.bounds[i - 1] if i > 0 else 0.0
+                hi = self.bounds[i] if i < len(self.bounds) else self.bounds[-1]
+                return lo + (hi - lo) * (rank - seen) / c
+            seen += c
+        return self.bounds[-1]
+
+
+class _Span:
+    __slots__ = ("timer", "name", "t0")
+
+    def __init__(self, timer: "StageTimer", name: str):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.observe(self.name, perf_counter() - self.t0)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class StageTimer:
+    """
+    Registry of per-stage histograms.
+
+    Parameters:
+        enabled (bool): Record spans (default: on if UTL_TIMING is set to a
+            value other than '', '0' or 'false')
+        bounds (sequence): Histogram bucket upper bounds in seconds
+    """
+
+    def __init__(self, enabled: Optional[bool] = None, bounds: Sequence[float] = BUCKETS):
+        if enabled is None:
+            enabled = os.environ.get(ENV_TIMING, "").lower() not in ("", "0", "false")
+        self.enabled = enabled
+        self.bounds = tuple(bounds)
+        self.hooks: List[Hook] = []
+        self._stages: Dict[str, Histogram] = {}
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def add_hook(self, hook: Hook) -> None:
+        """Call `hook(stage, seconds)` for every recorded span."""
+        self.hooks.append(hook)
+
+    def stage(self, name: str):
+        """Context manager timing one execution of `name` (no-op while disabled)."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def observe(self, name: str, seconds: float) -> None:
+        hist = self._stages.get(name)
+        if hist is None:
+            hist = self._stages.setdefault(name, Histogram(self.bounds))
+        hist.observe(seconds)
+        for hook in self.hooks:
+            hook(name, seconds)
+
+    def histograms(self) -> Dict[str, Histogram]:
+        return dict(self._stages)
+
+    def reset(self) -> None:
+        self._stages = {}
+
+    def summary(self) -> str:
+        """Plain-text table: count, mean, p50, p95 and total time per stage."""
+        lines = [f"{'stage':<16} {'count':>9} {'mean_us':>10} {'p50_us':>10} "
+                 f"{'p95_us':>10} {'total_s':>9}"]
+        for name, h in self._stages.items():
+            mean = h.total / h.count if h.count else 0.0
+            lines.append(f"{name:<16} {h.count:>9} {mean * 1e6:>10.1f} "
+                         f"{h.quantile(0.5) * 1e6:>10.1f} "
+                         f"{h.quantile(0.95) * 1e6:>10.1f} {h.total:>9.3f}")
+        return "\n".join(lines)
+
+    def render_prometheus(self, metric: str = "utl_stage_seconds") -> str:
+        """Histograms in the Prometheus text exposition format."""
+        out = [f"# HELP {metric} Latency of UTL scoring pipeline stages.",
+               f"# TYPE {metric} histogram"]
+        for name, h in self._stages.items():
+            cum = 0
+            for bound, c in zip(self.bounds + (float("inf"),), h.counts, strict=True):
+                cum += c
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                out.append(f'{metric}_bucket{{stage="{name}",le="{le}"}} {cum}')
+            out.append(f'{metric}_sum{{stage="{name}"}} {h.total!r}')
+            out.append(f'{metric}_count{{stage="{name}"}} {h.count}')
+        return "\n".join(out) + "\n"
+
+
+TIMER = StageTimer()
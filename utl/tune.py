@@ -0,0 +1,156 @@
+"""
+Hyperparameter search for UTLDetector by vectorized replay of a labeled dataset.
+
+Hazards depend only on (alpha, theta_mult, beta), so each distinct triple is
+one column of a UTLBatchDetector pass (triples are broadcast as the variant
+dimension and chunked across a process pool). The crisis threshold tau only
+affects the decision, so every tau is evaluated from the same hazards with a
+single sorted threshold sweep. gamma does not enter the hazard and is not tuned.
+
+Usage:
+    python -m utl.tune --file data/demo_synthetic.csv \\
+        --alpha 0.05,0.1,0.15,0.3 --theta-mult 0.5,1,1.5,3 --beta 0.4,0.6,0.8 \\
+        --tau 0.3:0.9:13 --workers 4 --out results/tune.csv
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from multiprocessing import get_context
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .batch import UTLBatchDetector
+from .metrics import threshold_sweep
+
+PARAMS = ("alpha", "theta_mult", "beta", "tau")
+METRICS = ("precision", "recall", "f1", "accuracy")
+
+
+def param_grid(alpha: Sequence[float], theta_mult: Sequence[float],
+               beta: Sequence[float], tau: Sequence[float]) -> pd.DataFrame:
+    """Full Cartesian grid as a DataFrame with one row per combination."""
+    return pd.DataFrame(list(product(alpha, theta_mult, beta, tau)), columns=list(PARAMS))
+
+
+def random_params(
+    n: int, ranges: Dict[str, Tuple[float, float]], seed: Optional[int] = None
+) -> pd.DataFrame:
+    """`n` uniform samples from per-parameter (low, high) ranges."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({p: rng.uniform(*ranges[p], size=n) for p in PARAMS})
+
+
+def _score_chunk(job):
+    conv, turns, X, y, triples, taus = job
+    det = UTLBatchDetector(alpha=triples[:, 0], theta_mult=triples[:, 1], beta=triples[:, 2])
+    H, _ = det.run(conv, turns, X[:, 0], X[:, 1], X[:, 2], X[:, 3])
+
+    # Per-conversation score = max hazard, label = any crisis turn
+    order = np.lexsort((turns, conv))
+    c = conv[order]
+    starts = np.flatnonzero(np.r_[True, c[1:] != c[:-1]])
+    conv_y = np.maximum.reduceat(y[order], starts)
+    conv_h = np.maximum.reduceat(H[order], starts, axis=0)
+
+    out = []
+    for k in range(len(triples)):
+        tau_k = taus[k]
+        turn_m = threshold_sweep(y, H[:, k], tau_k)
+        conv_m = threshold_sweep(conv_y, conv_h[:, k], tau_k)
+        block = {"alpha": triples[k, 0], "theta_mult": triples[k, 1], "beta": triples[k, 2],
+                 "tau": tau_k}
+        block.update({f"turn_{m}": turn_m[m] for m in METRICS})
+        block.update({f"conv_{m}": conv_m[m] for m in METRICS})
+        out.append(pd.DataFrame(block))
+    return pd.concat(out, ignore_index=True)
+
+
+def tune(conv_ids, turns, channels, labels, params: pd.DataFrame, workers: int = 1,
+         chunk: int = 32, rank_by: Sequence[str] = ("conv_f1", "turn_f1")) -> pd.DataFrame:
+    """
+    Replay a labeled dataset for every parameter row and rank the results.
+
+    Args:
+        conv_ids, turns: Conversation id and turn per row
+        channels: (N, 4) linguistic, behavioral, temporal, resilience values
+        labels: Binary per-turn crisis labels
+        params: DataFrame with columns alpha, theta_mult, beta, tau
+        workers: Processes for the replay (1 = in-process)
+        chunk: Distinct (alpha, theta_mult, beta) triples per batch pass
+        rank_by: Metric columns to sort by (descending)
+
+    Returns:
+        One row per parameter combination with per-turn (turn_*) and
+        per-conversation (conv_*) precision, recall, F1 and accuracy
+    """
+    if not len(params):
+        raise ValueError("params is empty: no parameter combinations to evaluate")
+    conv = np.asarray(conv_ids)
+    turns = np.asarray(turns)
+    X = np.asarray(channels, dtype=np.float64)
+    y = np.asarray(labels).astype(np.int8)
+    keys, taus = [], []
+    for key, tau in params.groupby(["alpha", "theta_mult", "beta"], sort=False)["tau"]:
+        keys.append(key)
+        taus.append(np.unique(tau.values.astype(np.float64)))
+    triples = np.array(keys, dtype=np.float64).reshape(-1, 3)
+
+    jobs = [(conv, turns, X, y, triples[a:a + chunk], taus[a:a + chunk])
+            for a in range(0, len(triples), chunk)]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+            parts = list(pool.map(_score_chunk, jobs))
+    else:
+        parts = [_score_chunk(j) for j in jobs]
+    table = pd.concat(parts, ignore_index=True)
+    return table.sort_values(list(rank_by), ascending=False, kind="stable").reset_index(drop=True)
+
+
+def _floats(spec: str):
+    """'0.1,0.2' -> list; 'lo:hi:n' -> n evenly spaced values."""
+    if ":" in spec:
+        lo, hi, n = spec.split(":")
+        return list(np.linspace(float(lo), float(hi), int(n)))
+    return [float(x) for x in spec.split(",") if x]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Grid/random search over UTLDetector parameters")
+    ap.add_argument("--file", default="data/demo_synthetic.csv", help="labeled CSV (demo schema)")
+    ap.add_argument("--alpha", default="0.05,0.1,0.15,0.2,0.3")
+    ap.add_argument("--theta-mult", default="0.5,1.0,1.5,2.0,3.0")
+    ap.add_argument("--beta", default="0.4,0.6,0.8,1.0")
+    ap.add_argument("--tau", default="0.3:0.9:13")
+    ap.add_argument("--random", type=int, default=0,
+                    help="draw N random samples within the min/max of each list "
+                         "instead of the grid")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=1)
+    ap.add_argument("--top", type=int, default=10, help="rows to print")
+    ap.add_argument("--out", default="results/tune.csv")
+    args = ap.parse_args(argv)
+
+    lists = dict(alpha=_floats(args.alpha), theta_mult=_floats(args.theta_mult),
+                 beta=_floats(args.beta), tau=_floats(args.tau))
+    empty = [k for k, v in lists.items() if not v]
+    if empty:
+        ap.error(f"no values for {', '.join(empty)}")
+    if args.random:
+        ranges = {k: (min(v), max(v)) for k, v in lists.items()}
+        params = random_params(args.random, ranges, args.seed)
+    else:
+        params = param_grid(**lists)
+
+    df = pd.read_csv(args.file)
+    X = df[["linguistic_hazard", "behavioral_hazard", "temporal_hazard", "resilience_score"]].values
+    table = tune(df["conversation_id"].values, df["turn"].values, X,
+                 df["crisis_label"].values, params, workers=args.workers)
+    table.to_csv(args.out, index=False)
+    print(table.head(args.top).to_string(index=False))
+    print("Saved:", args.out)
+
+
+if __name__ == "__main__":
+    main()